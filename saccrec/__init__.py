@@ -2,7 +2,7 @@
 import gettext
 import sys
 from faulthandler import enable as enable_faulthandler
-from os import getpid, kill, remove, system
+from os import getpid, kill, remove
 from os.path import dirname, exists, join
 
 from PySide6 import QtWidgets
@@ -43,18 +43,9 @@ def setup_i18n():
     tr.install('saccrec')
 
 
-def improve_ftdi_latency():
-    for i in range(4):
-        path = f'/dev/ttyUSB{i}'
-        if exists(path):
-            system(f'setserial {path} low_latency')
-
-
 def main():
     kill_hanged_processes()
 
-    improve_ftdi_latency()
-
     declare_gui_running_pid()
     enable_faulthandler()
 
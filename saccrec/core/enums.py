@@ -59,3 +59,37 @@ class Gain(IntEnum):
             Gain.G12: "5",
             Gain.G24: "6",
         }[self]
+
+
+class SamplingRate(IntEnum):
+    SR250 = 250
+    SR500 = 500
+    SR1000 = 1000
+    SR2000 = 2000
+    SR4000 = 4000
+    SR8000 = 8000
+    SR16000 = 16000
+
+    @classmethod
+    def from_value(cls, value: int) -> SamplingRate:
+        return cls(value)
+
+    @property
+    def label(self) -> str:
+        return f"{self.value} Hz"
+
+    @property
+    def settings(self) -> str:
+        return {
+            SamplingRate.SR16000: "0",
+            SamplingRate.SR8000: "1",
+            SamplingRate.SR4000: "2",
+            SamplingRate.SR2000: "3",
+            SamplingRate.SR1000: "4",
+            SamplingRate.SR500: "5",
+            SamplingRate.SR250: "6",
+        }[self]
+
+    @property
+    def command(self) -> str:
+        return "~" + self.settings
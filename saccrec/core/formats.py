@@ -4,6 +4,31 @@ from eoglib.models import Board, Protocol, Recorder, Study, Subject, Test
 from saccrec import settings
 
 
+def _recorder() -> Recorder:
+    return Recorder(
+        board=Board.OpenBCI_Cyton,
+        sample_rate=settings.hardware.sampling_rate,
+        channels=settings.hardware.channels.json
+    )
+
+
+def study_metadata(
+    subject: Subject,
+    protocol: Protocol,
+    light_intensity: int,
+    output_path: str,
+    source_filename: str
+) -> dict:
+    return {
+        'subject': subject.to_json(),
+        'protocol': protocol.to_json(template=True),
+        'recorder': _recorder().to_json(),
+        'light_intensity': light_intensity,
+        'output_path': output_path,
+        'obci_filename': source_filename,
+    }
+
+
 def create_study(
     subject: Subject,
     protocol: Protocol,
@@ -12,11 +37,7 @@ def create_study(
     source_filename: str
 ) -> Study:
     study = Study(
-        recorder=Recorder(
-            board=Board.OpenBCI_Cyton,
-            sample_rate=settings.hardware.sampling_rate,
-            channels=settings.hardware.channels.json
-        ),
+        recorder=_recorder(),
         subject=subject,
         protocol_name=protocol.name,
         light_intensity=light_intensity,
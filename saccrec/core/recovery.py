@@ -0,0 +1,118 @@
+import argparse
+import json
+import logging
+from os.path import splitext
+
+from eoglib.io import save_eog
+from eoglib.models import Channel, Protocol, Recorder, Study, StimulusPosition, Subject, Test
+from numpy import concatenate, int8, zeros
+
+from saccrec.recording.journal import (RECORD_CHECKPOINT, RECORD_MARKER, RECORD_METADATA, RECORD_SAMPLES,
+                                       RECORD_TEST_FINISHED, RECORD_TEST_STARTED, decode_checkpoint,
+                                       decode_marker, decode_samples, decode_test, read_journal)
+
+logger = logging.getLogger('saccrec')
+
+_STIMULUS_VALUES = zeros(256, dtype=int8)
+for _position in StimulusPosition:
+    _STIMULUS_VALUES[_position.value] = _position.stimulus
+
+
+class _Segment:
+
+    def __init__(self, index: int, started_at: float):
+        self.index = index
+        self.started_at = started_at
+        self.finished_at = None
+        self.chunks = []
+        self.markers = []
+
+
+def _build_test(stimulus, segment: _Segment, study: Study) -> Test:
+    samples = concatenate(segment.chunks)
+    return Test(
+        stimulus=stimulus,
+        channels={
+            Channel.Timestamps: samples['timestamp'].copy(),
+            Channel.Time: samples['counter'].copy(),
+            Channel.Horizontal: samples['horizontal'].copy(),
+            Channel.Vertical: samples['vertical'].copy(),
+            Channel.Stimulus: _STIMULUS_VALUES[samples['position']],
+        },
+        study=study,
+        markers=segment.markers,
+        complete=segment.finished_at is not None
+    )
+
+
+def recover_study(journal_path: str) -> Study:
+    metadata = {}
+    segments: dict[int, _Segment] = {}
+    current: _Segment = None
+    checkpoint = None
+
+    for kind, payload in read_journal(journal_path):
+        if kind == RECORD_METADATA:
+            metadata = json.loads(payload)
+        elif kind == RECORD_TEST_STARTED:
+            timestamp, index = decode_test(payload)
+            current = segments[index] = _Segment(index, timestamp)
+        elif kind == RECORD_TEST_FINISHED and current is not None:
+            current.finished_at = decode_test(payload)[0]
+            current = None
+        elif kind == RECORD_SAMPLES and current is not None:
+            current.chunks.append(decode_samples(payload))
+        elif kind == RECORD_MARKER and current is not None:
+            current.markers.append(decode_marker(payload))
+        elif kind == RECORD_CHECKPOINT:
+            checkpoint = decode_checkpoint(payload)
+
+    if not metadata:
+        raise ValueError(f'{journal_path} has no session metadata')
+
+    if checkpoint is not None:
+        logger.info(f'Last checkpoint: {checkpoint[1]} samples')
+
+    protocol = Protocol.from_json(metadata['protocol'])
+
+    study = Study(
+        recorder=Recorder.from_json(metadata['recorder']),
+        subject=Subject.from_json(metadata['subject']),
+        protocol_name=protocol.name,
+        light_intensity=metadata['light_intensity'],
+        obci_filename=metadata['obci_filename'],
+        recovered=True
+    )
+
+    for index, stimulus in enumerate(protocol):
+        segment = segments.get(index)
+        if segment is not None and segment.chunks:
+            study.append(_build_test(stimulus, segment, study))
+        else:
+            study.append(Test(stimulus=stimulus, channels={}, study=study))
+
+    return study
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild an EOG study from a recording journal')
+    parser.add_argument('journal', type=str, help='journal written while recording')
+    parser.add_argument('-o', '--output', type=str, default=None, help='output .eog file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    study = recover_study(args.journal)
+
+    output = args.output
+    if output is None:
+        output = splitext(args.journal)[0] + '.eog'
+
+    save_eog(output, study)
+
+    recorded = sum(1 for test in study if test.channels.samples_count > 0)
+    print(f'{recorded} of {len(study)} tests recovered to {output}')
+
+
+if __name__ == '__main__':
+    main()
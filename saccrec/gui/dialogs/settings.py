@@ -1,7 +1,7 @@
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from saccrec import settings
-from saccrec.core.enums import Gain, Language
+from saccrec.core.enums import Gain, Language, SamplingRate
 from saccrec.gui.widgets import ColorButton
 
 
@@ -157,14 +157,29 @@ class _HardwarePage(QtWidgets.QWidget):
         self._ports_combo.setDuplicatesEnabled(False)
 
         from saccrec.recording import CytonBoard
+        from saccrec.recording.openeog import BAUD_RATES
 
+        # Boards may have been plugged or switched on since the last scan
+        CytonBoard.invalidate_ports()
         for port in CytonBoard.list_ports():
             self._ports_combo.addItem(port, port)
 
-        # self._sample_rate_combo = QtWidgets.QComboBox()
-        # self._sample_rate_combo.setDuplicatesEnabled(False)
-        # for sr in (250, 500, 1000, 2000, 4000, 8000, 16000):
-        #     self._sample_rate_combo.addItem(f'{sr} Hz', sr)
+        self._sample_rate_combo = QtWidgets.QComboBox()
+        self._sample_rate_combo.setDuplicatesEnabled(False)
+        for sampling_rate in SamplingRate:
+            self._sample_rate_combo.addItem(sampling_rate.label, sampling_rate.value)
+        self._sample_rate_combo.currentIndexChanged.connect(self._check_baud_rate)
+
+        self._baud_rate_combo = QtWidgets.QComboBox()
+        self._baud_rate_combo.setDuplicatesEnabled(False)
+        for baud_rate in BAUD_RATES:
+            self._baud_rate_combo.addItem(str(baud_rate), baud_rate)
+        self._baud_rate_combo.currentIndexChanged.connect(self._check_baud_rate)
+
+        self._baud_rate_warning = QtWidgets.QLabel()
+        self._baud_rate_warning.setStyleSheet("color: red")
+        self._baud_rate_warning.setWordWrap(True)
+        self._baud_rate_warning.setVisible(False)
 
         channels_group = QtWidgets.QGroupBox(_("Channels"))
         self._channel_list = []
@@ -203,7 +218,9 @@ class _HardwarePage(QtWidgets.QWidget):
 
         form_layout = QtWidgets.QFormLayout()
         form_layout.addRow(_("Port"), self._ports_combo)
-        # form_layout.addRow(_('Sampling frequency'), self._sample_rate_combo)
+        form_layout.addRow(_("Sampling frequency"), self._sample_rate_combo)
+        form_layout.addRow(_("Baud rate"), self._baud_rate_combo)
+        form_layout.addRow(self._baud_rate_warning)
 
         channels_layout = QtWidgets.QVBoxLayout()
         channels_layout.addLayout(top_layout)
@@ -219,6 +236,33 @@ class _HardwarePage(QtWidgets.QWidget):
 
         self.load()
 
+    @property
+    def valid(self) -> bool:
+        from saccrec.recording.openeog import minimum_baud_rate
+
+        # The port must be able to carry every frame at the chosen rate
+        sampling_rate = self._sample_rate_combo.currentData()
+        baud_rate = self._baud_rate_combo.currentData()
+        if sampling_rate is None or baud_rate is None:
+            return True
+        return int(baud_rate) >= minimum_baud_rate(int(sampling_rate))
+
+    def _check_baud_rate(self):
+        from saccrec.recording.openeog import minimum_baud_rate
+
+        if self.valid:
+            self._baud_rate_warning.setVisible(False)
+            return
+
+        self._baud_rate_warning.setText(
+            _("{baud} baud is too slow for {rate}, use at least {minimum} baud").format(
+                baud=self._baud_rate_combo.currentData(),
+                rate=self._sample_rate_combo.currentText(),
+                minimum=minimum_baud_rate(int(self._sample_rate_combo.currentData())),
+            )
+        )
+        self._baud_rate_warning.setVisible(True)
+
     def _reset_available_channels(self):
         self._horizontal_channel_combo.clear()
         self._vertical_channel_combo.clear()
@@ -255,7 +299,10 @@ class _HardwarePage(QtWidgets.QWidget):
         else:
             self._ports_combo.setCurrentIndex(0)
 
-        # self._sample_rate_combo.setCurrentText(f'{settings.hardware.sampling_rate} Hz')
+        self._baud_rate_combo.setCurrentText(str(settings.hardware.baud_rate))
+        self._sample_rate_combo.setCurrentText(
+            SamplingRate.from_value(settings.hardware.sampling_rate).label
+        )
 
         for channel in self._channel_list:
             channel.load()
@@ -264,7 +311,8 @@ class _HardwarePage(QtWidgets.QWidget):
 
     def save(self):
         settings.hardware.port = str(self._ports_combo.currentData())
-        # settings.hardware.sampling_rate = int(self._sample_rate_combo.currentData())
+        settings.hardware.sampling_rate = int(self._sample_rate_combo.currentData())
+        settings.hardware.baud_rate = int(self._baud_rate_combo.currentData())
 
         for channel in self._channel_list:
             channel.save()
@@ -392,9 +440,11 @@ class SettingsDialog(QtWidgets.QDialog):
         self._contents_widget.setIconSize(QtCore.QSize(60, 60))
         self.adjustSize()
 
+        self._hardware_page = _HardwarePage()
+
         self._pages_widget = QtWidgets.QStackedWidget()
         self._pages_widget.addWidget(_GUISettingsPage())
-        self._pages_widget.addWidget(_HardwarePage())
+        self._pages_widget.addWidget(self._hardware_page)
         self._pages_widget.addWidget(_StimulusSettingsPage())
         self._contents_widget.setCurrentRow(0)
 
@@ -446,6 +496,14 @@ class SettingsDialog(QtWidgets.QDialog):
         self.setWindowTitle(self._pages_widget.currentWidget().title)
 
     def _on_accepted(self):
+        if not self._hardware_page.valid:
+            QtWidgets.QMessageBox.warning(
+                self,
+                _("Alert"),
+                _("The baud rate can't carry the selected sampling frequency"),
+            )
+            return
+
         for i in range(self._pages_widget.count()):
             self._pages_widget.widget(i).save()
         self.accept()
@@ -1,20 +1,28 @@
 import logging
+from time import monotonic
 
 from eoglib.models import Protocol, StimulusPosition, Subject
-from numpy import array, float32
+from numpy import arange, float32, full, isnan, maximum, where
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from saccrec import settings
-from saccrec.core.formats import create_study
+from saccrec.core.formats import create_study, study_metadata
 from saccrec.gui import icons  # noqa: F401
 from saccrec.gui.dialogs import AboutDialog, SDCardImport, SettingsDialog
 from saccrec.gui.widgets import LoggerWidget, SignalsWidget, StimulusPlayer
 from saccrec.gui.wizards import RecordSetupWizard
-from saccrec.recording import CytonBoard
+from saccrec.recording import CytonBoard, JournalWriter, LatencyTracer
 
 logger = logging.getLogger('saccrec')
 logger.setLevel(logging.INFO)
 
+_TELEMETRY_LOG = '/tmp/saccrec_telemetry.csv'
+
+_POSITION_VALUES = full(256, float('nan'), dtype=float32)
+_POSITION_VALUES[0x01] = -1
+_POSITION_VALUES[0x02] = 1
+_POSITION_VALUES[0x10] = 0
+
 
 class MainWindow(QtWidgets.QMainWindow):
 
@@ -30,7 +38,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self._light_intensity: int = 0
         self._filename: str = None
         self._studies: list[str] = []
-        self._current_file = None
+        self._journal: JournalWriter = None
+        self._tracer: LatencyTracer = None
         self._board = None
         self._last_position = 0
 
@@ -65,7 +74,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._stimulus_player.started.connect(self._on_test_started)
         self._stimulus_player.stopped.connect(self._on_test_stopped)
         self._stimulus_player.finished.connect(self._on_test_finished)
-        self._stimulus_player.refreshed.connect(self._on_stimulus_refreshed)
+        self._stimulus_player.positionChanged.connect(self._on_stimulus_position_changed)
 
         # Setting up top level menus
         menubar = self.menuBar()
@@ -165,7 +174,7 @@ class MainWindow(QtWidgets.QMainWindow):
     # ======================================
 
     def _on_connect_clicked(self):
-        self._board = CytonBoard.reset(port=settings.hardware.port)
+        self._board = CytonBoard.reset(port=settings.hardware.port, telemetry_log=_TELEMETRY_LOG)
 
         # Check for OpenBCI Connection
         if self._board.ready:
@@ -227,8 +236,6 @@ class MainWindow(QtWidgets.QMainWindow):
             self._filename = self._board.create_sd_file()
 
         if self._board.ready:
-            self._current_file = open(f'/tmp/{self._filename}.dat', 'wb')
-
             self._setup_gui_for_recording()
             self._signals_widget.setVisible(True)
 
@@ -241,6 +248,20 @@ class MainWindow(QtWidgets.QMainWindow):
             self._output_path = record_setup['output_path']
             self._light_intensity = record_setup['light_intensity']
 
+            self._journal = JournalWriter(
+                f'/tmp/{self._filename}.dat',
+                metadata=study_metadata(
+                    subject=self._subject,
+                    protocol=self._protocol,
+                    light_intensity=self._light_intensity,
+                    output_path=self._output_path,
+                    source_filename=self._filename
+                )
+            )
+            self._board.sink = self._journal.write
+
+            self._tracer = LatencyTracer() if settings.gui.trace_latency else None
+
             sampling_rate = settings.hardware.sampling_rate
 
             # Generating stimulus signals
@@ -257,10 +278,10 @@ class MainWindow(QtWidgets.QMainWindow):
     def _on_test_about_to_start(self):
         self._signals_widget.reset_data()
 
-        if self._board.ready:
-            self._board.marker(StimulusPosition.Center.marker)
-
     def _on_test_started(self, timestamp):
+        if self._journal is not None:
+            self._journal.test_started(self._current_test)
+
         if self._board.ready:
             self._board.start()
 
@@ -270,10 +291,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self._stimulus_player.stop()
         self._stimulus_player.close()
         self._board.stop()
+        self._close_journal()
+
+    def _close_journal(self):
+        if self._tracer is not None:
+            self._tracer.report()
+            self._tracer = None
+
+        if self._journal is not None:
+            self._board.sink = None
+            self._journal.close()
+            self._journal = None
+
+    def _marker(self, label: str):
+        sent_at = self._board.marker(label)
+        if self._journal is not None:
+            self._journal.marker(label, sent_at)
 
     def _on_test_finished(self):
-        self._current_test += 1
         self._board.stop()
+        if self._journal is not None:
+            self._journal.test_finished(self._current_test)
+        self._current_test += 1
         self._last_position = 0
         if self._current_test < len(self._protocol):
             stimulus = self._protocol[self._current_test]
@@ -281,9 +320,7 @@ class MainWindow(QtWidgets.QMainWindow):
             distance_to_subject = self._protocol.distance_to_subject(saccadic_distance)
             self._stimulus_player.start(stimulus, distance_to_subject)
         else:
-            if self._current_file is not None:
-                self._current_file.close()
-                self._current_file = None
+            self._close_journal()
 
             if self._board.ready:
                 self._board.close_sd_file()
@@ -309,26 +346,45 @@ class MainWindow(QtWidgets.QMainWindow):
                         )
                     )
 
-    def _on_stimulus_refreshed(self, value: int):
-        self._board.marker(StimulusPosition(value).marker)
+    def _on_stimulus_position_changed(self, value: int):
+        if self._board.ready:
+            self._marker(StimulusPosition(value).marker)
+
+    def _on_board_lost(self):
+        # The player's stopped signal would come back here through _on_test_stopped
+        with QtCore.QSignalBlocker(self._stimulus_player):
+            self._stimulus_player.stop()
+        self._stimulus_player.close()
+
+        self._current_test = 0
+        self._last_position = 0
+        self._board.stop()
+        self._close_journal()
+        self._setup_gui_for_non_recording()
+
+        QtWidgets.QMessageBox.critical(
+            self,
+            _('Error'),
+            _('The connection with the OpenEOG board was lost, the test was interrupted')
+        )
 
     def _on_read_data(self):
-        horizontal_list, vertical_list, position_list = [], [], []
+        if self._board.failed:
+            self._on_board_lost()
+            return
+
         data = self._board.read()
-        for index, horizontal, vertical, position in data:
-            horizontal_list.append(horizontal)
-            vertical_list.append(vertical)
-            self._last_position = {
-                0x01: -1,
-                0x02: 1,
-                0x10: 0,
-            }.get(position, self._last_position)
-
-            position_list.append(self._last_position)
-
-        if horizontal_list:
-            horizontal = array(horizontal_list, dtype=float32)
-            vertical = array(vertical_list, dtype=float32)
-            positions = array(position_list, dtype=float32)
-
-            self._signals_widget.plot(horizontal, vertical, positions)
+        if len(data) == 0:
+            return
+        handoff_at = monotonic()
+
+        values = _POSITION_VALUES[data.position]
+        known = where(isnan(values), -1, arange(len(values)))
+        maximum.accumulate(known, out=known)
+        positions = where(known >= 0, values[known], self._last_position).astype(float32)
+        self._last_position = positions[-1]
+
+        self._signals_widget.plot(data.horizontal, data.vertical, positions)
+
+        if self._tracer is not None:
+            self._tracer.record(data.timestamp, data.decoded_at, handoff_at, monotonic())
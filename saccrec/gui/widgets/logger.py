@@ -5,6 +5,7 @@ from PySide6 import QtCore, QtWidgets
 
 class LoggerSignal(QtCore.QObject):
     signal = QtCore.Signal()
+    message = QtCore.Signal(str)
 
     def __init__(self):
         super(LoggerSignal, self).__init__()
@@ -19,6 +20,7 @@ class LoggerWidget(Handler, QtWidgets.QPlainTextEdit):
         self.setReadOnly(True)
 
         self.logger_signal = LoggerSignal()
+        self.logger_signal.message.connect(self._append)
 
     def emit(self, record):
         msg = self.format(record)
@@ -33,10 +35,14 @@ class LoggerWidget(Handler, QtWidgets.QPlainTextEdit):
         elif record.levelno == WARN:
             fmt = '<span style="color: yellow">{msg}</span>'
 
+        # Records may come from acquisition threads, the widget is only touched from the GUI thread
+        self.logger_signal.message.emit(fmt.format(msg=msg))
+
+    def _append(self, html: str):
         try:
-            self.appendHtml(fmt.format(msg=msg))
+            self.appendHtml(html)
             self.repaint()
             self.logger_signal.signal.emit()
         except ValueError as error:
-            print(f'ValueError: {msg}')
+            print(f'ValueError: {html}')
             print(error)
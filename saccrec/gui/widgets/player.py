@@ -1,7 +1,8 @@
 import logging
 from math import ceil, floor, tan, radians
-from time import time
+from time import monotonic
 
+from numpy import diff, flatnonzero, searchsorted
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from saccrec import settings
@@ -12,12 +13,38 @@ from eoglib.models import SaccadicStimulus, StimulusPosition
 logger = logging.getLogger('saccrec')
 
 
+class MarkerSchedule:
+
+    def __init__(self, stimulus: SaccadicStimulus):
+        channel = stimulus.channel
+
+        self._onsets = [0, *(flatnonzero(diff(channel)) + 1).tolist(), len(channel)]
+        self._positions = [stimulus.position(onset) for onset in self._onsets]
+        self._current = 0
+
+    def __len__(self) -> int:
+        return len(self._onsets)
+
+    @property
+    def current(self) -> StimulusPosition:
+        return self._positions[self._current]
+
+    def advance(self, sample: int) -> bool:
+        current = max(searchsorted(self._onsets, sample, side='right') - 1, 0)
+        if current == self._current:
+            return False
+
+        previous = self.current
+        self._current = current
+        return self.current != previous
+
+
 class StimulusPlayer(QtWidgets.QWidget):
     aboutToStart = QtCore.Signal()
     started = QtCore.Signal(float)
     stopped = QtCore.Signal()
     finished = QtCore.Signal()
-    refreshed = QtCore.Signal(int)
+    positionChanged = QtCore.Signal(int)
 
     def __init__(self, parent=None, read_function: callable = None):
         super(StimulusPlayer, self).__init__()
@@ -36,6 +63,7 @@ class StimulusPlayer(QtWidgets.QWidget):
         self._timeout = None
         self._start_time = None
         self._stimulus = None
+        self._schedule: MarkerSchedule = None
 
         self._message = None
         self._left_ball = None
@@ -84,16 +112,16 @@ class StimulusPlayer(QtWidgets.QWidget):
         self._ball_color = settings.stimuli.ball_color
         self._background_color = settings.stimuli.back_color
 
-    def _screen_position(self, sample: int) -> tuple[QtCore.QPoint, StimulusPosition]:
-        position = self._stimulus.position(sample)
+    def _screen_position(self, position: StimulusPosition) -> QtCore.QPoint:
         return {
             StimulusPosition.Left: self._left_ball,
             StimulusPosition.Right: self._right_ball,
             StimulusPosition.Center: self._center_ball,
-        }.get(position, None), position
+        }.get(position, None)
 
     def start(self, stimulus: SaccadicStimulus, distance_to_subject: float):
         self._stimulus = stimulus
+        self._schedule = MarkerSchedule(stimulus)
         self._distance_to_subject = distance_to_subject
 
         self._load_settings()
@@ -121,35 +149,40 @@ class StimulusPlayer(QtWidgets.QWidget):
     def _start_test(self):
         self.aboutToStart.emit()
         self._message = None
-        self._ball_position, _ = self._screen_position(0)
+        self._ball_position = self._screen_position(self._schedule.current)
         self.repaint()
-        self._start_time = time()
+        self._start_time = monotonic()
         self._timer.start()
         self.started.emit(self._start_time)
 
+        # After started, so the journal already has the test when the marker lands
+        self.positionChanged.emit(self._schedule.current.value)
+
     def _stop_test(self):
         self._timer.stop()
         self._stimulus = None
+        self._schedule = None
         self._message = None
         self._ball_position = None
 
     def _on_timeout(self):
-        elapsed = (time() - self._start_time) * 1000.0
+        elapsed = (monotonic() - self._start_time) * 1000.0
         current_sample = ceil(elapsed / self._sampling_step)
 
-        previous_position = self._ball_position
-        self._ball_position, side = self._screen_position(current_sample)
+        changed = self._schedule.advance(current_sample)
+        side = self._schedule.current
 
         if self._read_function is not None:
             self._read_function()
 
-        if previous_position != self._ball_position:
+        if changed:
+            self._ball_position = self._screen_position(side)
             self.repaint()
 
-        if self._ball_position is None:
-            self.finish()
-
-        self.refreshed.emit(side.value)
+            if self._ball_position is None:
+                self.finish()
+            else:
+                self.positionChanged.emit(side.value)
 
     def paintEvent(self, event):
         painter = QtGui.QPainter()
@@ -4,8 +4,13 @@ from numpy import arange, array, float32, hstack, int32, ones, zeros
 from pyqtgraph import PlotCurveItem, PlotWidget, setConfigOption
 from PySide6 import QtGui, QtWidgets
 
+from saccrec import settings
+
 SAMPLING_STEP = 16
-WINDOW_LENGTH = 3000
+WINDOW_SECONDS = 3
+
+# Higher rates are decimated, the screen can't show more points anyway
+PLOT_RATE = 1000
 
 
 class SignalsWidget(QtWidgets.QWidget):
@@ -22,6 +27,11 @@ class SignalsWidget(QtWidgets.QWidget):
         self._vertical = None
         self._positions = None
 
+        self._window_length = WINDOW_SECONDS * PLOT_RATE
+        self._sampling_step = SAMPLING_STEP
+        self._decimation = 1
+        self._offset = 0
+
         setConfigOption('background', background_color)
         setConfigOption('foreground', 'k')
 
@@ -30,6 +40,7 @@ class SignalsWidget(QtWidgets.QWidget):
 
         self._horizontal_widget = PlotWidget()
         self._horizontal_widget.setTitle(_('Horizontal channel'))
+        self._horizontal_widget.setLabel('left', 'µV')
         self._horizontal_widget.setMouseEnabled(False, False)
         self._horizontal_widget.enableAutoRange(True, True)
         self._horizontal_widget.addItem(self._horizontal_plot)
@@ -40,6 +51,7 @@ class SignalsWidget(QtWidgets.QWidget):
 
         self._vertical_widget = PlotWidget()
         self._vertical_widget.setTitle(_('Vertical channel'))
+        self._vertical_widget.setLabel('left', 'µV')
         self._vertical_widget.setMouseEnabled(False, False)
         self._vertical_widget.enableAutoRange(True, True)
         self._vertical_widget.addItem(self._vertical_plot)
@@ -57,10 +69,17 @@ class SignalsWidget(QtWidgets.QWidget):
     def reset_data(self):
         self._first = True
 
-        self._time = arange(WINDOW_LENGTH, dtype=int32) * SAMPLING_STEP
-        self._horizontal = ones(WINDOW_LENGTH, dtype=float32)
-        self._vertical = ones(WINDOW_LENGTH, dtype=float32)
-        self._positions = zeros(WINDOW_LENGTH, dtype=int32)
+        sampling_rate = settings.hardware.sampling_rate
+        plot_rate = min(sampling_rate, PLOT_RATE)
+        self._decimation = sampling_rate // plot_rate
+        self._window_length = WINDOW_SECONDS * plot_rate
+        self._sampling_step = SAMPLING_STEP * PLOT_RATE // plot_rate
+        self._offset = 0
+
+        self._time = arange(self._window_length, dtype=int32) * self._sampling_step
+        self._horizontal = ones(self._window_length, dtype=float32)
+        self._vertical = ones(self._window_length, dtype=float32)
+        self._positions = zeros(self._window_length, dtype=int32)
 
         self._horizontal_plot.setData(self._time, self._horizontal)
         self._horizontal_positions_plot.setData(self._time, self._positions)
@@ -71,17 +90,28 @@ class SignalsWidget(QtWidgets.QWidget):
         if horizontal.size == 0 or vertical.size == 0 or positions.size == 0:
             return
 
+        if self._decimation > 1:
+            # Keeps the decimation phase across chunks of any size
+            start = -self._offset % self._decimation
+            self._offset = (self._offset + len(horizontal)) % self._decimation
+
+            horizontal = horizontal[start::self._decimation]
+            vertical = vertical[start::self._decimation]
+            positions = positions[start::self._decimation]
+            if horizontal.size == 0:
+                return
+
         if self._horizontal.size > 0 and self._first:
             self._horizontal = self._horizontal * horizontal.mean()
             self._vertical = self._vertical * vertical.mean()
             self._first = False
 
-        time = (arange(1, len(horizontal) + 1, dtype=int32) * SAMPLING_STEP) + self._time[-1]
+        time = (arange(1, len(horizontal) + 1, dtype=int32) * self._sampling_step) + self._time[-1]
 
-        self._time = hstack((self._time, time))[-WINDOW_LENGTH:]
-        self._horizontal = hstack((self._horizontal, horizontal))[-WINDOW_LENGTH:]
-        self._vertical = hstack((self._vertical, vertical))[-WINDOW_LENGTH:]
-        self._positions = hstack((self._positions, positions))[-WINDOW_LENGTH:]
+        self._time = hstack((self._time, time))[-self._window_length:]
+        self._horizontal = hstack((self._horizontal, horizontal))[-self._window_length:]
+        self._vertical = hstack((self._vertical, vertical))[-self._window_length:]
+        self._positions = hstack((self._positions, positions))[-self._window_length:]
 
         horizontal_mean, horizontal_std = self._horizontal.mean(), self._horizontal.std()
 
@@ -1,5 +1,15 @@
+from .decoding import Samples, decode_frames
+from .journal import JournalWriter, read_samples
+from .manager import BoardManager
 from .openeog import CytonBoard
+from .tracing import LatencyTracer
 
 __all__ = [
+    'BoardManager',
     'CytonBoard',
+    'JournalWriter',
+    'LatencyTracer',
+    'Samples',
+    'decode_frames',
+    'read_samples',
 ]
@@ -0,0 +1,145 @@
+import logging
+from threading import Event, Lock, Thread
+
+from numpy import concatenate, float32, ndarray, zeros
+
+from .decoding import Samples
+
+logger = logging.getLogger('saccrec')
+
+
+def _take(data: ndarray, start: int, count: int) -> ndarray:
+    end = start + count
+    if end <= len(data):
+        return data[start:end].copy()
+    return concatenate((data[start:], data[:end - len(data)]))
+
+
+def _put(data: ndarray, start: int, values: ndarray):
+    first = min(len(values), len(data) - start)
+    data[start:start + first] = values[:first]
+    data[:len(values) - first] = values[first:]
+
+
+class RingBuffer:
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._lock = Lock()
+
+        empty = Samples.empty()
+        self._index = zeros(capacity, dtype=empty.index.dtype)
+        self._horizontal = zeros(capacity, dtype=float32)
+        self._vertical = zeros(capacity, dtype=float32)
+        self._position = zeros(capacity, dtype=empty.position.dtype)
+        self._counter = zeros(capacity, dtype=empty.counter.dtype)
+        self._timestamp = None
+        self._decoded_at = None
+
+        self._written = 0
+        self._consumed = 0
+        self._overruns = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._written - self._consumed
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def overruns(self) -> int:
+        return self._overruns
+
+    def clear(self):
+        with self._lock:
+            self._written = 0
+            self._consumed = 0
+            self._overruns = 0
+
+    def write(self, samples: Samples):
+        count = len(samples)
+        if count == 0:
+            return
+
+        skipped = max(count - self._capacity, 0)
+
+        with self._lock:
+            start = (self._written + skipped) % self._capacity
+            _put(self._index, start, samples.index[skipped:])
+            _put(self._horizontal, start, samples.horizontal[skipped:])
+            _put(self._vertical, start, samples.vertical[skipped:])
+            _put(self._position, start, samples.position[skipped:])
+            _put(self._counter, start, samples.counter[skipped:])
+            self._timestamp = samples.timestamp
+            self._decoded_at = samples.decoded_at
+
+            self._written += count
+            if (lost := self._written - self._consumed - self._capacity) > 0:
+                self._consumed += lost
+                self._overruns += lost
+
+    def read(self, max_samples: int = 0) -> Samples:
+        with self._lock:
+            count = self._written - self._consumed
+            if max_samples > 0:
+                count = min(count, max_samples)
+
+            if count == 0:
+                return Samples.empty()
+
+            start = self._consumed % self._capacity
+            self._consumed += count
+
+            return Samples(
+                index=_take(self._index, start, count),
+                horizontal=_take(self._horizontal, start, count),
+                vertical=_take(self._vertical, start, count),
+                position=_take(self._position, start, count),
+                counter=_take(self._counter, start, count),
+                timestamp=self._timestamp,
+                decoded_at=self._decoded_at
+            )
+
+
+class AcquisitionWorker(Thread):
+
+    def __init__(
+        self,
+        read_function: callable,
+        buffer: RingBuffer,
+        idle_wait: float = 0.001,
+        on_error: callable = None
+    ):
+        super(AcquisitionWorker, self).__init__(name='OpenEOGAcquisition', daemon=True)
+
+        self._read_function = read_function
+        self._buffer = buffer
+        self._idle_wait = idle_wait
+        self._on_error = on_error
+        self._stop_event = Event()
+
+    @property
+    def buffer(self) -> RingBuffer:
+        return self._buffer
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                samples = self._read_function()
+            except Exception as error:
+                logger.error(f'Acquisition stopped: {error}')
+                if self._on_error is not None:
+                    self._on_error(error)
+                break
+
+            if len(samples) > 0:
+                self._buffer.write(samples)
+            else:
+                self._stop_event.wait(self._idle_wait)
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
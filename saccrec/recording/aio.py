@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import re
+from time import monotonic
+from typing import AsyncIterator
+
+from serial import Serial
+
+from saccrec.settings import hardware as conf
+
+from .clock import ClockModel
+from .commands import (RESPONSE_TERMINATOR, Response, channel_confirmed, command_succeeded, command_timeout,
+                       sampling_rate_confirmed)
+from .conversion import MicrovoltConverter
+from .decoding import FrameReader, Samples
+from .statistics import LossStatistics
+
+logger = logging.getLogger('saccrec')
+
+READ_SIZE = 1 << 16
+
+
+class AsyncCytonBoard:
+
+    def __init__(self, port: str):
+        self._port = port
+        self._serial: Serial = None
+        self._loop: asyncio.AbstractEventLoop = None
+
+        self._ready = True
+        self._recording = False
+        self._sd_open = False
+
+        self._frames = FrameReader()
+        self._statistics = LossStatistics()
+        self._clock = ClockModel(conf.sampling_rate)
+        self._converter = MicrovoltConverter.from_settings()
+        self._chunks: asyncio.Queue = asyncio.Queue()
+
+        self._command_lock = asyncio.Lock()
+        self._response: asyncio.Future = None
+        self._response_data = bytearray()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def recording(self) -> bool:
+        return self._recording
+
+    @property
+    def statistics(self) -> LossStatistics:
+        return self._statistics
+
+    @property
+    def clock(self) -> ClockModel:
+        return self._clock
+
+    async def connect(self):
+        logger.info('Initializing Cyton Board')
+
+        self._loop = asyncio.get_running_loop()
+        self._serial = Serial(port=self._port, baudrate=conf.baud_rate, timeout=0)
+        # Works on any loop implementing add_reader, qasync's QEventLoop included
+        self._loop.add_reader(self._serial.fileno(), self._on_readable)
+
+        await self.command('v')
+
+        response = await self.command(conf.sampling_rate_command)
+        if not sampling_rate_confirmed(response, conf.sampling_rate):
+            self._ready = False
+            logger.error(_('Error setting OpenEOG sampling rate to {rate} Hz').format(
+                rate=conf.sampling_rate
+            ))
+
+        if not command_succeeded(await self.command(conf.eog_channels_command)):
+            self._ready = False
+            logger.error(_('Error setting OpenEOG EOG channels'))
+
+        for index, channel in enumerate(conf.channels):
+            if channel.active:
+                cmd = channel.settings_command
+                if not channel_confirmed(await self.command(cmd), cmd):
+                    self._ready = False
+                    logger.error(_('Error setting OpenEOG Channel {index}').format(
+                        index=index + 1
+                    ))
+
+    async def close(self):
+        if self._recording:
+            await self.stop()
+
+        if self._sd_open:
+            await self.close_sd_file()
+
+        if self._serial is not None:
+            self._loop.remove_reader(self._serial.fileno())
+            self._serial.close()
+            self._serial = None
+
+        logger.info('Closing Cyton Board')
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._serial.fileno(), READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as error:
+            self._on_hang_up(error)
+            return
+
+        if not data:
+            self._on_hang_up(None)
+            return
+        received_at = monotonic()
+
+        if self._response is not None and not self._response.done():
+            self._response_data += data
+            if (position := self._response_data.find(RESPONSE_TERMINATOR)) < 0:
+                return
+
+            position += len(RESPONSE_TERMINATOR)
+            data = bytes(self._response_data[position:])
+            del self._response_data[position:]
+            self._response.set_result(bytes(self._response_data))
+
+        if not self._recording:
+            return
+
+        self._frames.feed(data)
+        samples = self._statistics.number(self._converter(self._frames.read()))
+        if len(samples) > 0:
+            samples.timestamp = received_at
+            self._clock.update(int(samples.counter[-1]), received_at)
+            samples.timestamps = self._clock.to_host(samples.counter)
+            self._chunks.put_nowait(samples)
+
+    def _on_hang_up(self, error: OSError):
+        # A readable fd that yields nothing is gone, keeping the reader would spin the loop
+        self._loop.remove_reader(self._serial.fileno())
+        self._ready = False
+        self._recording = False
+        self._sd_open = False
+
+        failure = ConnectionError(f'{self._port} was disconnected' + (f': {error}' if error else ''))
+        logger.error(str(failure))
+
+        if self._response is not None and not self._response.done():
+            self._response.set_exception(failure)
+        self._chunks.put_nowait(failure)
+
+    def _write(self, cmd: str):
+        self._serial.write(cmd.encode('ASCII'))
+
+    async def command(self, cmd: str, timeout: float = None) -> Response:
+        if timeout is None:
+            timeout = command_timeout(cmd)
+
+        async with self._command_lock:
+            started_at = monotonic()
+            self._response_data = bytearray()
+            self._response = self._loop.create_future()
+
+            self._write(cmd)
+            try:
+                raw = await asyncio.wait_for(asyncio.shield(self._response), timeout)
+            except asyncio.TimeoutError:
+                raw = bytes(self._response_data)
+            finally:
+                self._response = None
+
+        response = Response(cmd, raw, monotonic() - started_at)
+        response.log()
+
+        if response.fatal:
+            self._ready = False
+
+        return response
+
+    async def create_sd_file(self) -> str:
+        response = await self.command('S')
+        if match := re.search('[0-9A-F]{6}.EOG', response.message):
+            self._sd_open = True
+            return match[0]
+        self._ready = False
+
+    async def close_sd_file(self):
+        await self.command('j')
+        self._sd_open = False
+        logger.info('SD File Closed')
+
+    async def start(self):
+        self._frames.clear()
+        self._statistics.reset()
+        self._clock.reset()
+
+        # Chunks nobody consumed belong to the previous test
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+
+        self._recording = True
+        await self.command('(')
+
+    async def stop(self):
+        await self.command(')')
+        self._recording = False
+        self._frames.clear()
+        self._chunks.put_nowait(None)
+
+        logger.info(f'Test samples: {self._statistics}')
+
+    def marker(self, label: str) -> float:
+        self._write(f'O{label}')
+        sent_at = monotonic()
+        logger.debug(f'Marker {label} sent at {sent_at:.6f}')
+        return sent_at
+
+    async def chunks(self) -> AsyncIterator[Samples]:
+        while (samples := await self._chunks.get()) is not None:
+            if isinstance(samples, Exception):
+                raise samples
+            yield samples
+
+    def __aiter__(self) -> AsyncIterator[Samples]:
+        return self.chunks()
@@ -0,0 +1,227 @@
+import argparse
+import logging
+import tracemalloc
+from time import perf_counter_ns
+
+from numpy import arange, array, percentile, uint8, zeros
+from numpy.random import default_rng
+
+from saccrec.core.enums import SamplingRate
+
+from .capture import CAPTURE_RECEIVED, read_capture
+from .commands import RESPONSE_TERMINATOR
+from .decoding import FRAME_DTYPE
+from .openeog import CytonBoard
+from .simulator import SAMPLING_RATES, _put_24bits, _to_counts
+
+BENCHMARK_SECONDS = 10.0
+CHUNK_SIZES = (64, 1024, 16384)
+CORRUPTION_RATES = (0.0, 0.001, 0.01)
+BENCHMARK_RATES = (1000, 4000, 16000)
+# Snapshots are slow, so allocations are only counted on about this many reads
+ALLOCATION_READS = 100
+
+_TRACE_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+_RATE_COMMANDS = {rate.settings: rate.value for rate in SamplingRate}
+
+
+class _StreamSerial:
+
+    def __init__(self, data: bytes, chunk_size: int):
+        self._data = memoryview(data)
+        self._chunk_size = chunk_size
+        self._offset = 0
+        self._reply = b''
+        self._is_open = True
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+    @property
+    def finished(self) -> bool:
+        return self._offset >= len(self._data) and not self._reply
+
+    @property
+    def in_waiting(self) -> int:
+        if self._reply:
+            return len(self._reply)
+        return min(self._chunk_size, len(self._data) - self._offset)
+
+    def read(self, size: int = 1) -> bytes:
+        data, self._reply = self._reply[:size], self._reply[size:]
+        return data
+
+    def readinto(self, buffer: memoryview) -> int:
+        size = min(len(buffer), len(self._data) - self._offset)
+        buffer[:size] = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def write(self, data: bytes) -> int:
+        # Pipelined commands arrive in one write and each one gets its own reply
+        pending = data.decode('ASCII')
+        while pending:
+            if pending[0] == 'x':
+                size = pending.find('X') + 1 or len(pending)
+            else:
+                size = {'~': 2, 'O': 2, 'N': 3}.get(pending[0], 1)
+            cmd, pending = pending[:size], pending[size:]
+
+            if cmd[0] == 'O':
+                continue
+            elif cmd[0] == '~':
+                message = f'Success: Sample rate is {_RATE_COMMANDS[cmd[1:]]}Hz'
+            elif cmd[0] == 'x':
+                message = f'Channel set for {cmd[1]}'
+            else:
+                message = 'ok'
+            self._reply += f'[MSG] {message}'.encode('ASCII') + RESPONSE_TERMINATOR
+        return len(data)
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        self._is_open = False
+
+
+def synthetic_stream(sampling_rate: int, seconds: float, corruption_rate: float = 0.0, seed: int = 0) -> bytes:
+    rng = default_rng(seed)
+    count = int(sampling_rate * seconds)
+
+    time = arange(count) / sampling_rate
+    frames = zeros(count, dtype=FRAME_DTYPE)
+    frames['index'] = arange(count) & 0xFFFF
+    _put_24bits(frames, 'horizontal', _to_counts(300.0 * (time % 2.0 > 1.0) + rng.normal(0.0, 5.0, count)))
+    _put_24bits(frames, 'vertical', _to_counts(rng.normal(0.0, 5.0, count)))
+    frames['position'] = 0x10
+
+    data = frames.view(uint8)
+    if corruption_rate > 0:
+        corrupted = (rng.random(count) < corruption_rate).nonzero()[0]
+        offsets = corrupted * FRAME_DTYPE.itemsize + rng.integers(0, FRAME_DTYPE.itemsize, len(corrupted))
+        data[offsets] = rng.integers(0, 256, len(corrupted))
+
+    return data.tobytes()
+
+
+def captured_stream(path: str) -> bytes:
+    return b''.join(
+        data
+        for _timestamp, direction, data in read_capture(path)
+        if direction == CAPTURE_RECEIVED
+    )
+
+
+def _open_board(data: bytes, chunk_size: int) -> tuple[CytonBoard, _StreamSerial]:
+    serial = _StreamSerial(data, chunk_size)
+    board = CytonBoard(port='benchmark', serial=serial)
+    return board, serial
+
+
+def _allocated_blocks() -> int:
+    snapshot = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    return sum(statistic.count for statistic in snapshot.statistics('filename'))
+
+
+def run(data: bytes, chunk_size: int) -> dict:
+    board, serial = _open_board(data, chunk_size)
+    try:
+        latencies = []
+        samples = 0
+        started_at = perf_counter_ns()
+        while not serial.finished:
+            call_started_at = perf_counter_ns()
+            samples += len(board.read())
+            latencies.append(perf_counter_ns() - call_started_at)
+        elapsed = (perf_counter_ns() - started_at) / 1e9
+        dropped = board.statistics.dropped
+        resyncs = board.resyncs
+    finally:
+        board.close()
+
+    # Memory tracing slows everything down, so it gets its own pass
+    board, serial = _open_board(data, chunk_size)
+    peaks = []
+    allocations = []
+    stride = max(len(data) // chunk_size // ALLOCATION_READS, 1)
+    tracemalloc.start()
+    try:
+        reads = 0
+        while not serial.finished:
+            counted = reads % stride == 0
+            if counted:
+                blocks = _allocated_blocks()
+
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            # Held until counted, so the blocks behind the returned samples show up
+            chunk = board.read()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+
+            if counted:
+                allocations.append(_allocated_blocks() - blocks)
+            del chunk
+            reads += 1
+    finally:
+        tracemalloc.stop()
+        board.close()
+
+    latencies = array(latencies) / 1e3
+    return {
+        'bytes': len(data) / elapsed,
+        'samples': samples / elapsed,
+        'peak': sum(peaks) / max(len(peaks), 1),
+        'allocations': sum(allocations) / max(len(allocations), 1),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': latencies.max(),
+        'resyncs': resyncs,
+        'dropped': dropped,
+    }
+
+
+def _report(label: str, chunk_size: int, result: dict):
+    print(
+        f'{label:<28} {chunk_size:>7} '
+        f'{result["bytes"] / 1e6:>9.1f} {result["samples"] / 1e6:>9.2f} '
+        f'{result["peak"] / 1024:>10.1f} {result["allocations"]:>7.1f} '
+        f'{result["p50"]:>8.1f} {result["p99"]:>8.1f} {result["max"]:>9.1f} '
+        f'{result["resyncs"]:>7} {result["dropped"]:>7}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the OpenEOG framing and decoding path')
+    parser.add_argument('--seconds', type=float, default=BENCHMARK_SECONDS, help='seconds of synthetic signal')
+    parser.add_argument('--rates', type=int, nargs='+', default=BENCHMARK_RATES, choices=SAMPLING_RATES)
+    parser.add_argument('--chunks', type=int, nargs='+', default=CHUNK_SIZES, help='bytes available per read')
+    parser.add_argument('--corruption', type=float, nargs='+', default=CORRUPTION_RATES)
+    parser.add_argument('--capture', type=str, nargs='*', default=[], help='capture files to replay')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Loss reports for corrupted streams would drown the results
+    logging.getLogger('saccrec').setLevel(logging.ERROR)
+
+    print(
+        f'{"stream":<28} {"chunk":>7} {"MB/s":>9} {"Msmp/s":>9} '
+        f'{"peak KiB":>10} {"allocs":>7} {"p50 us":>8} {"p99 us":>8} {"max us":>9} {"resyncs":>7} {"dropped":>7}'
+    )
+
+    for rate in args.rates:
+        for corruption in args.corruption:
+            data = synthetic_stream(rate, args.seconds, corruption, args.seed)
+            for chunk_size in args.chunks:
+                _report(f'{rate} Hz, {corruption:.1%} corrupt', chunk_size, run(data, chunk_size))
+
+    for path in args.capture:
+        data = captured_stream(path)
+        for chunk_size in args.chunks:
+            _report(path[-28:], chunk_size, run(data, chunk_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import re
+from struct import Struct
+from threading import Lock
+from time import monotonic
+from typing import Iterator
+
+CAPTURE_MAGIC = b'OEOGCAP1'
+CAPTURE_RECEIVED = 0
+CAPTURE_SENT = 1
+
+_RECORD = Struct('<dBI')
+
+
+class CaptureWriter:
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, 'wb')
+        self._file.write(CAPTURE_MAGIC)
+        self._bytes = 0
+        self._lock = Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def write(self, data: bytes, timestamp: float, direction: int = CAPTURE_RECEIVED):
+        # Received data comes from the acquisition thread, markers from the GUI
+        with self._lock:
+            self._file.write(_RECORD.pack(timestamp, direction, len(data)))
+            self._file.write(data)
+            if direction == CAPTURE_RECEIVED:
+                self._bytes += len(data)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_capture(path: str) -> Iterator[tuple[float, int, bytes]]:
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f'{path} is not an OpenEOG capture file')
+
+        while len(header := f.read(_RECORD.size)) == _RECORD.size:
+            timestamp, direction, size = _RECORD.unpack(header)
+            data = f.read(size)
+            if len(data) < size:
+                break
+            yield timestamp, direction, data
+
+
+def capture_sampling_rate(path: str) -> int:
+    # The board confirms the rate it was set to while initializing, before streaming
+    replies = bytearray()
+    for _timestamp, direction, data in read_capture(path):
+        if direction == CAPTURE_RECEIVED:
+            replies += data
+            if answered := re.search(rb'Sample rate is (\d+) ?Hz', replies):
+                return int(answered[1])
+        elif data.startswith(b'('):
+            break
+    return None
+
+
+def _is_command(record: tuple[float, int, bytes]) -> bool:
+    # Markers are fire and forget, only commands wait for the board to answer
+    return record[1] == CAPTURE_SENT and not record[2].startswith(b'O')
+
+
+class ReplaySerial:
+
+    def __init__(self, path: str, realtime: bool = True):
+        self._records = list(read_capture(path))
+        self._realtime = realtime
+
+        self._next = 0
+        self._pending = bytearray()
+        self._commands = 0
+        self._is_open = True
+
+        self._origin = self._records[0][0] if self._records else 0.0
+        self._started_at = monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+    @property
+    def finished(self) -> bool:
+        return self._next == len(self._records) and not self._pending
+
+    def _load(self):
+        elapsed = monotonic() - self._started_at
+
+        while self._next < len(self._records):
+            record = self._records[self._next]
+            timestamp, direction, data = record
+
+            if self._realtime and timestamp - self._origin > elapsed:
+                break
+
+            if _is_command(record):
+                # Replies only become available once the command was sent again
+                if self._commands == 0:
+                    break
+                self._commands -= 1
+            elif direction == CAPTURE_RECEIVED:
+                self._pending += data
+
+            self._next += 1
+
+    @property
+    def in_waiting(self) -> int:
+        self._load()
+        return len(self._pending)
+
+    def read(self, size: int = 1) -> bytes:
+        self._load()
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+    def readinto(self, buffer: memoryview) -> int:
+        self._load()
+        size = min(len(buffer), len(self._pending))
+        with memoryview(self._pending) as pending:
+            buffer[:size] = pending[:size]
+        del self._pending[:size]
+        return size
+
+    def read_all(self) -> bytes:
+        return self.read(self.in_waiting)
+
+    def write(self, data: bytes) -> int:
+        if not data.startswith(b'O'):
+            self._commands += 1
+        return len(data)
+
+    def reset_input_buffer(self):
+        # Bytes flushed while capturing never reached the capture file
+        pass
+
+    def close(self):
+        self._is_open = False
@@ -0,0 +1,83 @@
+from threading import Lock
+
+from numpy import float64, ndarray
+
+CLOCK_HALF_LIFE = 60.0
+
+
+class ClockModel:
+
+    def __init__(self, sampling_rate: float, half_life: float = CLOCK_HALF_LIFE):
+        self._nominal_period = 1.0 / sampling_rate
+        self._half_life = half_life
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._updates = 0
+            self._last_timestamp = None
+
+            self._weight = 0.0
+            self._mean_counter = 0.0
+            self._mean_timestamp = 0.0
+            self._counter_variance = 0.0
+            self._covariance = 0.0
+
+            self._period = self._nominal_period
+            self._offset = 0.0
+
+    def __str__(self):
+        return f'{self.sampling_rate:.3f} Hz ({self.drift_ppm:+.1f} ppm)'
+
+    @property
+    def updates(self) -> int:
+        return self._updates
+
+    @property
+    def period(self) -> float:
+        return self._period
+
+    @property
+    def offset(self) -> float:
+        return self._offset
+
+    @property
+    def sampling_rate(self) -> float:
+        return 1.0 / self._period
+
+    @property
+    def drift_ppm(self) -> float:
+        return (self._nominal_period / self._period - 1.0) * 1e6
+
+    def update(self, counter: int, timestamp: float):
+        with self._lock:
+            decay = 1.0
+            if self._last_timestamp is not None:
+                decay = 0.5 ** (max(timestamp - self._last_timestamp, 0.0) / self._half_life)
+            self._last_timestamp = timestamp
+            self._updates += 1
+
+            self._weight = self._weight * decay + 1.0
+
+            counter_delta = counter - self._mean_counter
+            self._mean_counter += counter_delta / self._weight
+            timestamp_delta = timestamp - self._mean_timestamp
+            self._mean_timestamp += timestamp_delta / self._weight
+
+            self._counter_variance = self._counter_variance * decay + counter_delta * (counter - self._mean_counter)
+            self._covariance = self._covariance * decay + counter_delta * (timestamp - self._mean_timestamp)
+
+            if self._updates > 1 and self._counter_variance > 0:
+                self._period = self._covariance / self._counter_variance
+            self._offset = self._mean_timestamp - self._period * self._mean_counter
+
+    def to_host(self, counter: int | ndarray) -> float | ndarray:
+        if isinstance(counter, ndarray):
+            return self._offset + self._period * counter.astype(float64)
+        return self._offset + self._period * counter
+
+    def to_counter(self, timestamp: float | ndarray) -> float | ndarray:
+        if isinstance(timestamp, ndarray):
+            return (timestamp.astype(float64) - self._offset) / self._period
+        return (timestamp - self._offset) / self._period
@@ -0,0 +1,105 @@
+import logging
+import re
+
+logger = logging.getLogger('saccrec')
+
+RESPONSE_TERMINATOR = b'$$$'
+DEFAULT_COMMAND_TIMEOUT = 0.5
+COMMAND_POLL_INTERVAL = 0.002
+
+_FATAL_ERRORS = (
+    'Communications timeout - Device failed to poll Host',
+    'createfdContiguous failCorresponding',
+)
+
+COMMAND_TIMEOUTS = {
+    'v': 3.0,
+    'S': 3.0,
+    'j': 3.0,
+    '(': 2.0,
+    ')': 2.0,
+}
+
+
+def command_timeout(cmd: str) -> float:
+    return COMMAND_TIMEOUTS.get(cmd[:1], DEFAULT_COMMAND_TIMEOUT)
+
+
+def sampling_rate_confirmed(response: 'Response', sampling_rate: int) -> bool:
+    answered = re.search(r'Sample rate is (\d+) ?Hz', response.message)
+    return answered is not None and int(answered[1]) == sampling_rate
+
+
+def command_succeeded(response: 'Response') -> bool:
+    # The firmware reports bad arguments as a plain 'Failure: ...' message, not as [ERR]
+    return not (response.error or response.timed_out or 'Failure' in response)
+
+
+def channel_confirmed(response: 'Response', cmd: str) -> bool:
+    # Pipelined replies must still line up with the channel that was requested
+    answered = re.search(r'Channel set for (\w)', response.message)
+    return command_succeeded(response) and (answered is None or answered[1] == cmd[1])
+
+
+class Response:
+
+    def __init__(self, command: str, raw: bytes, elapsed: float):
+        self._command = command
+        self._raw = raw
+        self._elapsed = elapsed
+        self._complete = RESPONSE_TERMINATOR in raw
+        self._error = False
+
+        message = raw.split(RESPONSE_TERMINATOR)[0].decode('ASCII', errors='ignore')
+        if '[MSG]' in message:
+            message = message.split('[MSG]')[1]
+        elif '[ERR]' in message:
+            self._error = True
+            message = message.split('[ERR]')[1]
+        self._message = message.strip() if self._complete else ''
+
+    def __str__(self):
+        return self._message
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._message
+
+    @property
+    def command(self) -> str:
+        return self._command
+
+    @property
+    def raw(self) -> bytes:
+        return self._raw
+
+    @property
+    def message(self) -> str:
+        return self._message
+
+    @property
+    def error(self) -> bool:
+        return self._error
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    @property
+    def timed_out(self) -> bool:
+        return not self._complete
+
+    @property
+    def fatal(self) -> bool:
+        return any(error in self._message for error in _FATAL_ERRORS)
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    def log(self):
+        if self.timed_out:
+            logger.info(f'<strong>[{self._command}]</strong>')
+        elif self._error or self.fatal:
+            logger.error(f'<strong>[{self._command}]</strong>: {self._message}')
+        else:
+            logger.info(f'<strong>[{self._command}]</strong>: {self._message}')
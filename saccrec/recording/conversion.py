@@ -0,0 +1,43 @@
+from numpy import float32, multiply, ndarray
+
+from saccrec.settings import hardware as conf
+
+from .decoding import Samples
+
+ADS1299_VREF = 4.5
+ADS1299_FULL_SCALE = 2 ** 23 - 1
+
+
+def microvolts_per_count(gain: int, vref: float = ADS1299_VREF) -> float:
+    return vref / gain / ADS1299_FULL_SCALE * 1e6
+
+
+def to_microvolts(counts: ndarray, scale: float) -> ndarray:
+    return multiply(counts, float32(scale), dtype=float32)
+
+
+class MicrovoltConverter:
+
+    def __init__(self, horizontal_gain: int = 24, vertical_gain: int = 24, vref: float = ADS1299_VREF):
+        self._horizontal_scale = microvolts_per_count(horizontal_gain, vref)
+        self._vertical_scale = microvolts_per_count(vertical_gain, vref)
+
+    @classmethod
+    def from_settings(cls) -> 'MicrovoltConverter':
+        return cls(
+            horizontal_gain=conf.channels[conf.horizontal_channel - 1].gain,
+            vertical_gain=conf.channels[conf.vertical_channel - 1].gain
+        )
+
+    @property
+    def horizontal_scale(self) -> float:
+        return self._horizontal_scale
+
+    @property
+    def vertical_scale(self) -> float:
+        return self._vertical_scale
+
+    def __call__(self, samples: Samples) -> Samples:
+        samples.horizontal = to_microvolts(samples.horizontal, self._horizontal_scale)
+        samples.vertical = to_microvolts(samples.vertical, self._vertical_scale)
+        return samples
@@ -0,0 +1,310 @@
+from numpy import concatenate, dtype, frombuffer, int32, int64, isin, ndarray, uint8, uint16, zeros
+
+FRAME_SIZE = 10
+FRAME_HEADER = 0x00
+FRAME_POSITIONS = (0x01, 0x02, 0x04, 0x08, 0x10)
+FRAME_READER_CAPACITY = 1 << 16
+
+_VALID_POSITIONS = frozenset(FRAME_POSITIONS)
+
+FRAME_DTYPE = dtype([
+    ('header', 'u1'),
+    ('index', '>u2'),
+    ('horizontal', 'u1', (3,)),
+    ('vertical', 'u1', (3,)),
+    ('position', 'u1'),
+])
+
+
+class Samples:
+
+    def __init__(
+        self,
+        index: ndarray,
+        horizontal: ndarray,
+        vertical: ndarray,
+        position: ndarray,
+        counter: ndarray = None,
+        timestamp: float = None,
+        board: int = None,
+        decoded_at: float = None,
+        timestamps: ndarray = None
+    ):
+        self._index = index
+        self._horizontal = horizontal
+        self._vertical = vertical
+        self._position = position
+        self._counter = index.astype(int64) if counter is None else counter
+        self._timestamp = timestamp
+        self._board = board
+        self._decoded_at = decoded_at
+        self._timestamps = timestamps
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, key: slice) -> 'Samples':
+        return Samples(
+            index=self._index[key],
+            horizontal=self._horizontal[key],
+            vertical=self._vertical[key],
+            position=self._position[key],
+            counter=self._counter[key],
+            timestamp=self._timestamp,
+            board=self._board,
+            decoded_at=self._decoded_at,
+            timestamps=None if self._timestamps is None else self._timestamps[key]
+        )
+
+    @classmethod
+    def empty(cls) -> 'Samples':
+        return cls(
+            index=zeros(0, dtype=uint16),
+            horizontal=zeros(0, dtype=int32),
+            vertical=zeros(0, dtype=int32),
+            position=zeros(0, dtype=uint8),
+            counter=zeros(0, dtype=int64)
+        )
+
+    @classmethod
+    def concatenate(cls, chunks: list['Samples']) -> 'Samples':
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return cls.empty()
+
+        timestamps = None
+        if all(chunk.timestamps is not None for chunk in chunks):
+            timestamps = concatenate([chunk.timestamps for chunk in chunks])
+
+        return cls(
+            index=concatenate([chunk.index for chunk in chunks]),
+            horizontal=concatenate([chunk.horizontal for chunk in chunks]),
+            vertical=concatenate([chunk.vertical for chunk in chunks]),
+            position=concatenate([chunk.position for chunk in chunks]),
+            counter=concatenate([chunk.counter for chunk in chunks]),
+            timestamp=chunks[-1].timestamp,
+            board=chunks[-1].board,
+            decoded_at=chunks[-1].decoded_at,
+            timestamps=timestamps
+        )
+
+    @property
+    def index(self) -> ndarray:
+        return self._index
+
+    @property
+    def horizontal(self) -> ndarray:
+        return self._horizontal
+
+    @horizontal.setter
+    def horizontal(self, value: ndarray):
+        self._horizontal = value
+
+    @property
+    def vertical(self) -> ndarray:
+        return self._vertical
+
+    @vertical.setter
+    def vertical(self, value: ndarray):
+        self._vertical = value
+
+    @property
+    def position(self) -> ndarray:
+        return self._position
+
+    @property
+    def counter(self) -> ndarray:
+        return self._counter
+
+    @counter.setter
+    def counter(self, value: ndarray):
+        self._counter = value
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: float):
+        self._timestamp = value
+
+    @property
+    def board(self) -> int:
+        return self._board
+
+    @board.setter
+    def board(self, value: int):
+        self._board = value
+
+    @property
+    def decoded_at(self) -> float:
+        return self._decoded_at
+
+    @decoded_at.setter
+    def decoded_at(self, value: float):
+        self._decoded_at = value
+
+    @property
+    def timestamps(self) -> ndarray:
+        return self._timestamps
+
+    @timestamps.setter
+    def timestamps(self, value: ndarray):
+        self._timestamps = value
+
+
+def _join_24bits(words: ndarray) -> ndarray:
+    result = words[:, 0].astype(int32) << 16
+    result |= words[:, 1].astype(int32) << 8
+    result |= words[:, 2]
+
+    # Samples are 24-bit two's complement, move the sign bit to bit 31
+    result ^= 0x800000
+    result -= 0x800000
+    return result
+
+
+def decode_frames(data: bytes | memoryview) -> Samples:
+    count = len(data) // FRAME_SIZE
+    if count == 0:
+        return Samples.empty()
+
+    frames = frombuffer(data, dtype=FRAME_DTYPE, count=count)
+
+    valid = (frames['header'] == FRAME_HEADER) & isin(frames['position'], FRAME_POSITIONS)
+    if not valid.all():
+        frames = frames[valid]
+
+    return Samples(
+        index=frames['index'].astype(uint16),
+        horizontal=_join_24bits(frames['horizontal']),
+        vertical=_join_24bits(frames['vertical']),
+        position=frames['position'].copy()
+    )
+
+
+class FrameReader:
+
+    def __init__(self, capacity: int = FRAME_READER_CAPACITY):
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._end = 0
+
+        self._resyncs = 0
+        self._discarded = 0
+        self._invalid_positions = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def resyncs(self) -> int:
+        return self._resyncs
+
+    @property
+    def discarded(self) -> int:
+        return self._discarded
+
+    @property
+    def invalid_positions(self) -> int:
+        return self._invalid_positions
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+
+    def _reserve(self, size: int):
+        if self._end + size <= len(self._buffer):
+            return
+
+        pending = self._end - self._start
+        if pending + size > len(self._buffer):
+            buffer = bytearray(max(len(self._buffer) * 2, pending + size))
+            buffer[:pending] = memoryview(self._buffer)[self._start:self._end]
+            self._buffer = buffer
+        else:
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+
+        self._start = 0
+        self._end = pending
+
+    def writable(self, size: int) -> memoryview:
+        self._reserve(size)
+        return memoryview(self._buffer)[self._end:self._end + size]
+
+    def commit(self, size: int):
+        self._end += size
+
+    def feed(self, data: bytes):
+        if size := len(data):
+            self._reserve(size)
+            self._buffer[self._end:self._end + size] = data
+            self._end += size
+
+    def _resync(self) -> bool:
+        buffer, start, end = self._buffer, self._start, self._end
+
+        candidate = start
+        while True:
+            candidate = buffer.find(b'\x00', candidate + 1, end)
+            if candidate < 0:
+                candidate = end
+                break
+            if candidate + FRAME_SIZE > end:
+                break
+            if buffer[candidate + FRAME_SIZE - 1] in _VALID_POSITIONS:
+                # A lone match is often misaligned payload, the next frame confirms it when buffered
+                following = candidate + FRAME_SIZE
+                if following + FRAME_SIZE > end or (
+                    buffer[following] == FRAME_HEADER and buffer[following + FRAME_SIZE - 1] in _VALID_POSITIONS
+                ):
+                    break
+
+        self._resyncs += 1
+        self._discarded += candidate - start
+        self._start = candidate
+
+        return candidate + FRAME_SIZE <= end
+
+    def _valid_run(self, max_frames: int) -> int:
+        count = (self._end - self._start) // FRAME_SIZE
+        if max_frames > 0:
+            count = min(count, max_frames)
+        if count == 0:
+            return 0
+
+        view = memoryview(self._buffer)[self._start:self._start + count * FRAME_SIZE]
+        frames = frombuffer(view, dtype=FRAME_DTYPE)
+        valid = (frames['header'] == FRAME_HEADER) & isin(frames['position'], FRAME_POSITIONS)
+        del frames, view
+
+        if valid.all():
+            return count
+        return int(valid.argmin())
+
+    def read(self, max_frames: int = 0) -> Samples:
+        chunks = []
+        remaining = max_frames
+
+        while len(self) >= FRAME_SIZE:
+            count = self._valid_run(remaining)
+            if count > 0:
+                end = self._start + count * FRAME_SIZE
+                chunks.append(decode_frames(memoryview(self._buffer)[self._start:end]))
+                self._start = end
+
+                if max_frames > 0:
+                    remaining -= count
+                    if remaining == 0:
+                        break
+            else:
+                if self._buffer[self._start] == FRAME_HEADER:
+                    self._invalid_positions += 1
+                if not self._resync():
+                    break
+
+        if self._start == self._end:
+            self.clear()
+
+        return Samples.concatenate(chunks)
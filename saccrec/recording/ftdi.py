@@ -0,0 +1,97 @@
+import array
+import fcntl
+import logging
+import termios
+from os import listdir
+from os.path import basename, exists, join, realpath
+
+logger = logging.getLogger('saccrec')
+
+SYSFS_ROOT = '/sys'
+FTDI_DRIVER = 'ftdi_sio'
+FTDI_LATENCY_TIMER = 1
+
+# From linux/serial.h, pyserial toggles the same flag
+_ASYNC_LOW_LATENCY = 0x2000
+
+
+def _tty_path(device: str, root: str) -> str:
+    return join(root, 'class', 'tty', basename(realpath(device)))
+
+
+def is_ftdi(device: str, root: str = SYSFS_ROOT) -> bool:
+    driver = join(_tty_path(device, root), 'device', 'driver')
+    return exists(driver) and basename(realpath(driver)) == FTDI_DRIVER
+
+
+def ftdi_devices(root: str = SYSFS_ROOT) -> list[str]:
+    try:
+        names = listdir(join(root, 'class', 'tty'))
+    except OSError:
+        return []
+    return sorted(device for device in (f'/dev/{name}' for name in names) if is_ftdi(device, root))
+
+
+def read_latency_timer(device: str, root: str = SYSFS_ROOT) -> int:
+    try:
+        with open(join(_tty_path(device, root), 'device', 'latency_timer'), 'rt') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def set_latency_timer(device: str, value: int = FTDI_LATENCY_TIMER, root: str = SYSFS_ROOT) -> int:
+    previous = read_latency_timer(device, root)
+    if previous is None:
+        logger.warning(f'{device} has no FTDI latency timer')
+        return None
+
+    if previous != value:
+        try:
+            with open(join(_tty_path(device, root), 'device', 'latency_timer'), 'wt') as f:
+                f.write(f'{value}\n')
+        except OSError as error:
+            logger.warning(f'Setting the latency timer of {device} failed: {error}')
+
+    current = read_latency_timer(device, root)
+    if current != value:
+        logger.warning(f'{device} latency timer is {current} ms instead of {value} ms')
+    return current
+
+
+def low_latency(fd: int) -> bool:
+    flags = array.array('i', [0] * 32)
+    try:
+        fcntl.ioctl(fd, termios.TIOCGSERIAL, flags)
+    except (OSError, ValueError):
+        return None
+    return bool(flags[4] & _ASYNC_LOW_LATENCY)
+
+
+def tune_serial(serial, latency_timer: int = FTDI_LATENCY_TIMER, root: str = SYSFS_ROOT) -> int:
+    # Returns the timer the port had before, so it can be restored on close
+    device = serial.port
+    if not is_ftdi(device, root):
+        logger.debug(f'{device} is not an FTDI device, leaving its latency alone')
+        return None
+
+    previous = read_latency_timer(device, root)
+    timer = set_latency_timer(device, latency_timer, root)
+
+    try:
+        serial.set_low_latency_mode(True)
+    except (AttributeError, ValueError) as error:
+        logger.debug(f'Low latency mode on {device} failed: {error}')
+
+    flag = {None: 'unknown', True: 'on', False: 'off'}[low_latency(serial.fileno())]
+    if timer is None:
+        logger.info(f'USB latency on {device}: unknown, low latency {flag}')
+    else:
+        logger.info(f'USB latency on {device}: up to {timer} ms, low latency {flag}')
+    return previous
+
+
+def restore_latency_timer(device: str, previous: int, root: str = SYSFS_ROOT):
+    if previous is not None and read_latency_timer(device, root) != previous:
+        set_latency_timer(device, previous, root)
+        logger.info(f'{device} latency timer restored to {previous} ms')
@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+from queue import Empty, SimpleQueue
+from struct import Struct
+from threading import Thread
+from time import monotonic
+from typing import Iterator
+from zlib import crc32
+
+from numpy import concatenate, dtype, empty, frombuffer, ndarray
+
+from .decoding import Samples
+
+logger = logging.getLogger('saccrec')
+
+JOURNAL_MAGIC = b'OEOGJRN1'
+JOURNAL_BATCH_SAMPLES = 1 << 14
+JOURNAL_FLUSH_INTERVAL = 0.5
+JOURNAL_FSYNC_INTERVAL = 2.0
+
+RECORD_METADATA = 0
+RECORD_SAMPLES = 1
+RECORD_MARKER = 2
+RECORD_TEST_STARTED = 3
+RECORD_TEST_FINISHED = 4
+RECORD_CHECKPOINT = 5
+
+_RECORD = Struct('<BII')
+_MARKER = Struct('<d')
+_TEST = Struct('<di')
+_CHECKPOINT = Struct('<dQ')
+
+SAMPLE_DTYPE = dtype([
+    ('counter', '<i8'),
+    ('index', '<u2'),
+    ('horizontal', '<f4'),
+    ('vertical', '<f4'),
+    ('position', 'u1'),
+    ('timestamp', '<f8'),
+])
+
+
+def _encode(chunks: list[Samples]) -> ndarray:
+    records = empty(sum(len(chunk) for chunk in chunks), dtype=SAMPLE_DTYPE)
+
+    start = 0
+    for chunk in chunks:
+        end = start + len(chunk)
+        records['counter'][start:end] = chunk.counter
+        records['index'][start:end] = chunk.index
+        records['horizontal'][start:end] = chunk.horizontal
+        records['vertical'][start:end] = chunk.vertical
+        records['position'][start:end] = chunk.position
+        if chunk.timestamps is not None:
+            records['timestamp'][start:end] = chunk.timestamps
+        else:
+            records['timestamp'][start:end] = chunk.timestamp or 0.0
+        start = end
+
+    return records
+
+
+def read_journal(path: str) -> Iterator[tuple[int, bytes]]:
+    with open(path, 'rb') as f:
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f'{path} is not an OpenEOG journal')
+
+        while len(header := f.read(_RECORD.size)) == _RECORD.size:
+            kind, size, checksum = _RECORD.unpack(header)
+            payload = f.read(size)
+
+            # Whatever follows a torn or damaged record can't be trusted
+            if len(payload) < size or crc32(payload) != checksum:
+                logger.warning(f'{path} is truncated after {f.tell() - len(payload) - _RECORD.size} bytes')
+                break
+
+            yield kind, payload
+
+
+def decode_samples(payload: bytes) -> ndarray:
+    return frombuffer(payload, dtype=SAMPLE_DTYPE)
+
+
+def decode_marker(payload: bytes) -> tuple[float, str]:
+    return _MARKER.unpack_from(payload)[0], payload[_MARKER.size:].decode('ASCII')
+
+
+def decode_test(payload: bytes) -> tuple[float, int]:
+    return _TEST.unpack(payload)
+
+
+def decode_checkpoint(payload: bytes) -> tuple[float, int]:
+    return _CHECKPOINT.unpack(payload)
+
+
+def read_samples(path: str) -> ndarray:
+    chunks = [
+        decode_samples(payload)
+        for kind, payload in read_journal(path)
+        if kind == RECORD_SAMPLES
+    ]
+    if not chunks:
+        return empty(0, dtype=SAMPLE_DTYPE)
+    return concatenate(chunks)
+
+
+class JournalWriter(Thread):
+
+    def __init__(
+        self,
+        path: str,
+        metadata: dict = None,
+        batch_samples: int = JOURNAL_BATCH_SAMPLES,
+        flush_interval: float = JOURNAL_FLUSH_INTERVAL,
+        fsync_interval: float = JOURNAL_FSYNC_INTERVAL
+    ):
+        super(JournalWriter, self).__init__(name='OpenEOGJournal', daemon=True)
+
+        self._path = path
+        self._batch_samples = batch_samples
+        self._flush_interval = flush_interval
+        self._fsync_interval = fsync_interval
+
+        self._file = open(path, 'wb')
+        self._file.write(JOURNAL_MAGIC)
+        self._write_record(RECORD_METADATA, json.dumps(metadata or {}, default=str).encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._queue = SimpleQueue()
+        self._written = 0
+        self._closed = False
+
+        self.start()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def write(self, samples: Samples):
+        if len(samples) > 0 and not self._closed:
+            self._queue.put(samples)
+
+    def _event(self, kind: int, payload: bytes):
+        if not self._closed:
+            self._queue.put((kind, payload))
+
+    def marker(self, label: str, timestamp: float = None):
+        timestamp = monotonic() if timestamp is None else timestamp
+        self._event(RECORD_MARKER, _MARKER.pack(timestamp) + label.encode('ASCII'))
+
+    def test_started(self, index: int, timestamp: float = None):
+        timestamp = monotonic() if timestamp is None else timestamp
+        self._event(RECORD_TEST_STARTED, _TEST.pack(timestamp, index))
+
+    def test_finished(self, index: int, timestamp: float = None):
+        timestamp = monotonic() if timestamp is None else timestamp
+        self._event(RECORD_TEST_FINISHED, _TEST.pack(timestamp, index))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self.join()
+
+        logger.info(f'{self._written} samples journaled to {self._path}')
+
+    def _write_record(self, kind: int, payload: bytes | memoryview):
+        self._file.write(_RECORD.pack(kind, len(payload), crc32(payload)))
+        self._file.write(payload)
+
+    def run(self):
+        chunks = []
+        pending = 0
+        flushed_at = synced_at = monotonic()
+
+        running = True
+        while running:
+            event = None
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except Empty:
+                item = Samples.empty()
+
+            if item is None:
+                running = False
+            elif isinstance(item, tuple):
+                event = item
+            elif len(item) > 0:
+                chunks.append(item)
+                pending += len(item)
+
+            now = monotonic()
+            flush = pending >= self._batch_samples or now - flushed_at >= self._flush_interval
+            if not (flush or event or not running):
+                continue
+
+            try:
+                # Samples go first so events keep their place in the stream
+                if pending > 0:
+                    self._write_record(RECORD_SAMPLES, _encode(chunks).data.cast('B'))
+                    self._written += pending
+                    chunks = []
+                    pending = 0
+
+                if event is not None:
+                    self._write_record(*event)
+
+                if flush or not running:
+                    if now - synced_at >= self._fsync_interval or not running:
+                        self._write_record(RECORD_CHECKPOINT, _CHECKPOINT.pack(now, self._written))
+                        self._file.flush()
+                        os.fsync(self._file.fileno())
+                        synced_at = now
+                    else:
+                        self._file.flush()
+                    flushed_at = now
+            except OSError as error:
+                logger.error(f'Writing journal {self._path} failed: {error}')
+                self._closed = True
+                running = False
+
+        self._file.close()
@@ -0,0 +1,141 @@
+import atexit
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from weakref import WeakSet
+
+from .decoding import Samples
+from .openeog import CytonBoard
+
+logger = logging.getLogger('saccrec')
+
+_managers = WeakSet()
+
+
+class BoardManager:
+
+    def __init__(self, ports: list[str], captures: list[str] = None):
+        if len(set(ports)) != len(ports):
+            raise ValueError('Every board must be connected to a different port')
+
+        if captures is None:
+            captures = [None] * len(ports)
+
+        self._boards: list[CytonBoard] = []
+        self._received = [0] * len(ports)
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+
+        # Each board spends most of its initialization waiting for replies
+        with ThreadPoolExecutor(max_workers=max(len(ports), 1)) as executor:
+            futures = [
+                executor.submit(CytonBoard, port=port, capture=capture, board_id=board_id)
+                for board_id, (port, capture) in enumerate(zip(ports, captures))
+            ]
+
+        errors = []
+        for port, future in zip(ports, futures):
+            try:
+                self._boards.append(future.result())
+            except Exception as error:
+                errors.append(f'{port}: {error}')
+
+        if errors:
+            for board in self._boards:
+                board.close()
+            raise IOError(f'Could not open every board ({", ".join(errors)})')
+
+        _managers.add(self)
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    def __getitem__(self, board_id: int) -> CytonBoard:
+        return self._boards[board_id]
+
+    def __iter__(self):
+        return iter(self._boards)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def boards(self) -> list[CytonBoard]:
+        return list(self._boards)
+
+    @property
+    def ports(self) -> list[str]:
+        return [board.port for board in self._boards]
+
+    @property
+    def ready(self) -> bool:
+        return all(board.ready for board in self._boards)
+
+    @property
+    def received(self) -> list[int]:
+        return list(self._received)
+
+    @property
+    def throughput(self) -> float:
+        end = self._stopped_at or monotonic()
+        if not self._started_at or end <= self._started_at:
+            return 0.0
+        return sum(self._received) / (end - self._started_at)
+
+    def _each(self, method: str) -> list:
+        with ThreadPoolExecutor(max_workers=len(self._boards)) as executor:
+            return list(executor.map(lambda board: getattr(board, method)(), self._boards))
+
+    def create_sd_files(self) -> list[str]:
+        return self._each('create_sd_file')
+
+    def close_sd_files(self):
+        self._each('close_sd_file')
+
+    def start(self):
+        self._received = [0] * len(self._boards)
+        self._each('start')
+        self._started_at = monotonic()
+        self._stopped_at = 0.0
+
+    def stop(self):
+        self._stopped_at = monotonic()
+        self._each('stop')
+        self.report()
+
+    def marker(self, label: str):
+        for board in self._boards:
+            board.marker(label)
+
+    def read(self, max_samples: int = 0) -> list[Samples]:
+        chunks = []
+        for board in self._boards:
+            samples = board.read(max_samples)
+            self._received[board.board_id] += len(samples)
+            chunks.append(samples)
+        return chunks
+
+    def report(self):
+        logger.info(f'{len(self._boards)} boards, {self.throughput:.1f} samples/s in total')
+        for board in self._boards:
+            statistics = board.statistics
+            message = f'Board {board.board_id} ({board.port}): {statistics}'
+            if statistics.dropped > 0 or statistics.out_of_order > 0:
+                logger.warning(message)
+            else:
+                logger.info(message)
+
+    def close(self):
+        if self._boards:
+            self._each('close')
+            self._boards = []
+        _managers.discard(self)
+
+
+@atexit.register
+def close_managers():
+    for manager in list(_managers):
+        manager.close()
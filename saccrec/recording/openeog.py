@@ -1,137 +1,369 @@
 import atexit
 import logging
+import os
 import re
-from struct import unpack
-from time import sleep
+import select
+from io import UnsupportedOperation
+from time import monotonic, sleep
 
 from serial import Serial
-from serial.tools.list_ports import comports
 
+from saccrec.core.enums import SamplingRate
 from saccrec.settings import hardware as conf
 
+from .acquisition import AcquisitionWorker, RingBuffer
+from .capture import CAPTURE_SENT, CaptureWriter, ReplaySerial, capture_sampling_rate
+from .clock import ClockModel
+from .commands import (COMMAND_POLL_INTERVAL, RESPONSE_TERMINATOR, Response, channel_confirmed, command_succeeded,
+                       command_timeout, sampling_rate_confirmed)
+from .conversion import MicrovoltConverter
+from .decoding import FRAME_DTYPE, FrameReader, Samples
+from .ftdi import restore_latency_timer, tune_serial
+from .ports import invalidate_ports_cache, list_openeog_ports
+from .statistics import LossStatistics
+from .telemetry import Telemetry
+
 logger = logging.getLogger('saccrec')
 
-_COM_ERROR = 'Communications timeout - Device failed to poll Host'
-BUFFER_SIZE = 60
+RING_BUFFER_SECONDS = 30
+LOSS_REPORT_INTERVAL = 1.0
 
+READ_POLL_TIMEOUT = 0.005
+READ_SIZE = 1 << 16
 
-class CytonBoard:
+_POLL_FAILED = select.POLLERR | select.POLLHUP | select.POLLNVAL
 
-    @staticmethod
-    def list_ports() -> list[str]:
-        filter_regex = 'OpenEOG'
-        devices = [p.device for p in comports()]
+BAUD_RATES = (115200, 230400, 460800, 921600, 1000000, 2000000, 3000000)
+BAUD_RATE_HEADROOM = 0.9
+
+# 8N1 framing puts 10 bits on the wire for every byte
+_BITS_PER_BYTE = 10
 
-        def _get_firmware_string(port, timeout=0):
-            with Serial(port=port, baudrate=115200, timeout=timeout) as ser:
-                ser.write(b'v')
-                sleep(1)
-                return ser.read_all().decode('utf-8', errors='ignore')
 
-        ports = []
-        for device in devices:
-            msg = _get_firmware_string(device)
-            if re.search(filter_regex, msg):
-                ports.append(device)
+def required_baud_rate(sampling_rate: int) -> int:
+    return sampling_rate * FRAME_DTYPE.itemsize * _BITS_PER_BYTE
+
+
+def minimum_baud_rate(sampling_rate: int) -> int:
+    required = required_baud_rate(sampling_rate) / BAUD_RATE_HEADROOM
+    return next((baud for baud in BAUD_RATES if baud >= required), BAUD_RATES[-1])
+
+
+class CytonBoard:
 
-        return ports
+    @staticmethod
+    def list_ports() -> list[str]:
+        in_use = set()
+        if (board := CytonBoard.board_instance) is not None and board.is_open:
+            in_use.add(board.port)
+        return list_openeog_ports(in_use=in_use, baud_rate=conf.baud_rate)
 
-    def __init__(self, port: str):
+    @staticmethod
+    def invalidate_ports():
+        invalidate_ports_cache()
+
+    def __init__(
+        self,
+        port: str,
+        capture: str = None,
+        serial=None,
+        board_id: int = None,
+        telemetry_log: str = None,
+        sampling_rate: int = None,
+        baud_rate: int = None
+    ):
         logger.info('Initializing Cyton Board')
 
         self._port = port
+        self._sampling_rate = sampling_rate or conf.sampling_rate
+        self._baud_rate = baud_rate or conf.baud_rate
+        self._board_id = board_id
         self._recording = False
         self._sd_open = False
 
-        self._processed_samples = 0
+        self._decoded = 0
+        self._command_errors = 0
         self._ready = True
-        self._buffer = b''
+        self._failed = False
+        self._frames = FrameReader()
+        self._samples: RingBuffer = None
+        self._acquisition: AcquisitionWorker = None
+        self._statistics = LossStatistics()
+        self._clock = ClockModel(self._sampling_rate)
+        self._converter = MicrovoltConverter.from_settings()
+        self._sink = None
+        self._stopped_at: float = None
+        self._reported_dropped = 0
+        self._loss_reported_at = 0.0
+
+        self._capture = None
+        if capture is not None:
+            self._capture = CaptureWriter(capture)
+            logger.info(f'Capturing raw serial data to {capture}')
+
+        self._latency_timer = None
+        if serial is None:
+            serial = Serial(
+                port=port,
+                baudrate=self._baud_rate,
+                timeout=0
+            )
+            self._latency_timer = tune_serial(serial, conf.latency_timer)
+        self._serial = serial
 
-        self._serial = Serial(
-            port=port,
-            baudrate=115200,
-            timeout=0
+        try:
+            self._fd = serial.fileno()
+        except (AttributeError, UnsupportedOperation):
+            self._fd = None
+
+        self._poller = None
+        if self._fd is not None and conf.blocking_reads:
+            self._poller = select.poll()
+            self._poller.register(self._fd, select.POLLIN)
+
+        self._check_baud_rate()
+
+        self._command('v')
+
+        channels = [
+            (index, channel.settings_command)
+            for index, channel in enumerate(conf.channels)
+            if channel.active
+        ]
+        responses = self._commands(
+            [SamplingRate.from_value(self._sampling_rate).command, conf.eog_channels_command] + [cmd for _index, cmd in channels]
         )
 
-        sleep(2)
+        if not sampling_rate_confirmed(responses[0], self._sampling_rate):
+            self._ready = False
+            logger.error(_('Error setting OpenEOG sampling rate to {rate} Hz').format(
+                rate=self._sampling_rate
+            ))
+
+        if not command_succeeded(responses[1]):
+            self._ready = False
+            logger.error(_('Error setting OpenEOG EOG channels'))
 
-        self._command('v', wait=1)
-        self._command(conf.eog_channels_command)
+        for (index, cmd), response in zip(channels, responses[2:]):
+            if not channel_confirmed(response, cmd):
+                self._ready = False
+                logger.error(_('Error setting OpenEOG Channel {index}').format(
+                    index=index + 1
+                ))
 
-        for index, channel in enumerate(conf.channels):
-            if channel.active:
-                cmd = channel.settings_command
-                if 'too few chars' in self._command(cmd):
-                    self._ready = False
-                    logger.error(_('Error setting OpenEOG Channel {index}').format(
-                        index=index + 1
-                    ))
+        if msg := self._read_available():
+            logger.warning(f'Hanged data: {msg}')
 
-        sleep(1)
-        if msg := self._serial.read_all():
-            logger.warn(f'Hanged data: {msg}')
+        self._telemetry = None
+        if telemetry_log is not None:
+            self._telemetry = Telemetry(self, path=telemetry_log)
 
     board_instance = None
 
+    def _check_baud_rate(self):
+        required = required_baud_rate(self._sampling_rate)
+        if required > self._baud_rate:
+            self._ready = False
+            logger.error(_('{rate} Hz needs at least {baud} baud').format(
+                rate=self._sampling_rate,
+                baud=minimum_baud_rate(self._sampling_rate)
+            ))
+        elif required > self._baud_rate * BAUD_RATE_HEADROOM:
+            logger.warning(f'{self._sampling_rate} Hz uses {required / self._baud_rate:.0%} of {self._baud_rate} baud')
+
     @classmethod
-    def reset(cls, port: str):
+    def reset(
+        cls,
+        port: str,
+        capture: str = None,
+        telemetry_log: str = None,
+        sampling_rate: int = None,
+        baud_rate: int = None
+    ):
         if cls.board_instance is not None:
             cls.board_instance.close()
-        cls.board_instance = CytonBoard(port=port)
+        cls.board_instance = CytonBoard(
+            port=port,
+            capture=capture,
+            telemetry_log=telemetry_log,
+            sampling_rate=sampling_rate or conf.sampling_rate,
+            baud_rate=baud_rate or conf.baud_rate
+        )
         return cls.board_instance
 
-    def _command(self, cmd: str, wait: float = 0.2) -> str:
-        self._serial.write(cmd.encode('ASCII'))
-
-        if wait > 0:
-            sleep(wait)
-
-            msg = self._serial.read_all()
-            if b'$$$' in msg:
-                is_error = False
-                decoded_message = msg.decode('ASCII', errors='ignore')
-                if '[MSG]' in decoded_message:
-                    decoded_message = decoded_message.split('[MSG]')[1].strip()
-                elif '[ERR]' in decoded_message:
-                    is_error = True
-                    decoded_message = decoded_message.split('[ERR]')[1].strip()
-
-                if _COM_ERROR in decoded_message:
-                    logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    self._ready = False
-                elif 'createfdContiguous failCorresponding' in decoded_message:
-                    logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    self._ready = False
-                else:
-                    if is_error:
-                        logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    else:
-                        logger.info(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                return decoded_message
+    @classmethod
+    def replay(cls, path: str, realtime: bool = True, sampling_rate: int = None):
+        sampling_rate = sampling_rate or capture_sampling_rate(path) or conf.sampling_rate
+        # There is no wire behind a capture, so the baud rate only has to pass the check
+        return CytonBoard(
+            port=path,
+            serial=ReplaySerial(path, realtime=realtime),
+            sampling_rate=sampling_rate,
+            baud_rate=minimum_baud_rate(sampling_rate)
+        )
+
+    def _read_available(self) -> bytes:
+        data = self._serial.read(self._serial.in_waiting)
+        if data and self._capture is not None:
+            self._capture.write(data, monotonic())
+        return data
+
+    def _read_into_frames(self) -> int:
+        size = self._serial.in_waiting
+        if size == 0:
+            return 0
+
+        view = self._frames.writable(size)
+        if self._fd is not None:
+            try:
+                count = os.readv(self._fd, [view])
+            except BlockingIOError:
+                count = 0
+        else:
+            count = self._serial.readinto(view)
+
+        if count and self._capture is not None:
+            self._capture.write(view[:count], monotonic())
+        self._frames.commit(count)
+
+        return count
+
+    def _wait_into_frames(self, timeout: float) -> int:
+        # Sleeps in poll until the port has data, then takes all of it in a
+        # single read without asking pyserial how much is waiting
+        events = self._poller.poll(timeout * 1000)
+        if not events:
+            return 0
+
+        if events[0][1] & _POLL_FAILED:
+            raise OSError(f'{self._port} is no longer readable')
+
+        view = self._frames.writable(READ_SIZE)
+        try:
+            count = os.readv(self._fd, [view])
+        except BlockingIOError:
+            count = 0
+
+        if count and self._capture is not None:
+            self._capture.write(view[:count], monotonic())
+        self._frames.commit(count)
+
+        return count
+
+    def _write(self, cmd: str):
+        data = cmd.encode('ASCII')
+        self._serial.write(data)
+        if self._capture is not None:
+            self._capture.write(data, monotonic(), CAPTURE_SENT)
+
+    def _read_responses(self, cmds: list[str], timeout: float) -> list[Response]:
+        started_at = monotonic()
+        deadline = started_at + timeout
+
+        data = bytearray()
+        responses = []
+        start = 0
+        while len(responses) < len(cmds):
+            if (position := data.find(RESPONSE_TERMINATOR, start)) >= 0:
+                position += len(RESPONSE_TERMINATOR)
+                responses.append(Response(cmds[len(responses)], bytes(data[start:position]), monotonic() - started_at))
+                start = position
+            elif chunk := self._read_available():
+                data += chunk
+            elif monotonic() >= deadline:
+                break
             else:
-                logger.info(f'<strong>[{cmd}]</strong>')
+                sleep(COMMAND_POLL_INTERVAL)
+
+        if len(responses) == len(cmds):
+            self._frames.feed(data[start:])
+        else:
+            elapsed = monotonic() - started_at
+            responses.append(Response(cmds[len(responses)], bytes(data[start:]), elapsed))
+            responses.extend(Response(cmd, b'', elapsed) for cmd in cmds[len(responses):])
+
+        return responses
+
+    def _read_response(self, cmd: str, timeout: float) -> Response:
+        return self._read_responses([cmd], timeout)[0]
+
+    def _check(self, response: Response) -> Response:
+        response.log()
+
+        if response.error or response.timed_out:
+            self._command_errors += 1
+
+        if response.fatal:
+            self._ready = False
+
+        return response
+
+    def _command(self, cmd: str, timeout: float = None) -> Response:
+        self._write(cmd)
+
+        if timeout is None:
+            timeout = command_timeout(cmd)
+
+        return self._check(self._read_response(cmd, timeout))
+
+    def _commands(self, cmds: list[str], timeout: float = None) -> list[Response]:
+        # Pipelined in a single write, the board answers each one in order
+        self._write(''.join(cmds))
+
+        if timeout is None:
+            timeout = sum(command_timeout(cmd) for cmd in cmds)
 
-        return ''
+        return [self._check(response) for response in self._read_responses(cmds, timeout)]
 
     @property
     def ready(self) -> bool:
         return self._ready
 
+    @property
+    def port(self) -> str:
+        return self._port
+
+    @property
+    def sampling_rate(self) -> int:
+        return self._sampling_rate
+
+    @property
+    def baud_rate(self) -> int:
+        return self._baud_rate
+
+    @property
+    def board_id(self) -> int:
+        return self._board_id
+
+    @property
+    def is_open(self) -> bool:
+        return self._serial.is_open
+
     def close(self):
+        if self._telemetry is not None:
+            self._telemetry.stop()
+
         if self._recording:
             self.stop()
 
-        if self._sd_open:
+        # A port that went away can't take commands anymore
+        if self._sd_open and not self._failed:
             self.close_sd_file()
 
         self._serial.close()
+        restore_latency_timer(self._port, self._latency_timer)
+
+        if self._capture is not None:
+            self._capture.close()
+            logger.info(f'Captured {self._capture.bytes} bytes to {self._capture.path}')
+            self._capture = None
 
         logger.info('Closing Cyton Board')
 
     def create_sd_file(self) -> str:
-        msg = self._command('S', wait=2)
+        msg = self._command('S')
         try:
-            result = re.search('[0-9A-F]{6}.EOG', msg)[0]
+            result = re.search('[0-9A-F]{6}.EOG', msg.message)[0]
             self._sd_open = True
             return result
         except TypeError:
@@ -139,64 +371,196 @@ class CytonBoard:
             self._ready = False
 
     def close_sd_file(self):
-        self._command('j', wait=2)
+        self._command('j')
         self._sd_open = False
         logger.info('SD File Closed')
 
     def start(self):
-        self._buffer = b''
+        started_at = monotonic()
+        if self._stopped_at is not None:
+            logger.info(f'Dead time between tests: {started_at - self._stopped_at:.3f} s')
+
+        self._frames.clear()
+        self._statistics.reset()
+        self._clock.reset()
+        self._reported_dropped = 0
+
+        # Anything buffered before the start command belongs to no test
         self._serial.reset_input_buffer()
-        sleep(1)
-        try:
-            self._command('(', wait=2)
-            self._recording = True
-        except ValueError:
-            self._recording = True
+        if self._command('(', timeout=conf.start_timeout).timed_out:
+            logger.warning(f'Board did not confirm the start within {conf.start_timeout:.1f} s')
+        self._recording = True
+
+        self._start_acquisition()
+        logger.info(f'Board started in {(monotonic() - started_at) * 1000:.0f} ms')
 
     def stop(self):
+        started_at = monotonic()
+        self._stop_acquisition()
+
+        if self._failed:
+            self._recording = False
+            self._frames.clear()
+            return
+
+        # Frames still in flight are discarded while waiting for the reply
         self._serial.reset_input_buffer()
-        sleep(1)
-        while self._serial.in_waiting == 0:
-            sleep(1)
-        self._command(')', wait=2).strip()
+        if self._command(')', timeout=conf.stop_timeout).timed_out:
+            logger.warning(f'Board did not confirm the stop within {conf.stop_timeout:.1f} s')
         self._recording = False
+
         self._serial.reset_input_buffer()
-        sleep(1)
-        self._buffer = b''
+        self._frames.clear()
 
-    def read(self) -> tuple[int, int, int, int]:
-        buff = self._serial.read(self._serial.in_waiting)
+        self._stopped_at = monotonic()
+        logger.info(f'Board stopped in {(self._stopped_at - started_at) * 1000:.0f} ms')
 
-        self._buffer += buff
-        index = 0
-        while index < len(self._buffer) and self._buffer[index] != 0:
-            index += 1
+    @property
+    def overruns(self) -> int:
+        return self._samples.overruns if self._samples is not None else 0
 
-        if index > 0:
-            self._buffer = self._buffer[index:]
+    @property
+    def pending(self) -> int:
+        # Bytes still waiting in the driver plus those not decoded yet
+        waiting = self._serial.in_waiting if self._serial.is_open else 0
+        return waiting + len(self._frames)
 
-        if len(self._buffer) >= BUFFER_SIZE:
-            buff = self._buffer[:BUFFER_SIZE]
-            self._buffer = self._buffer[BUFFER_SIZE:]
+    @property
+    def resyncs(self) -> int:
+        return self._frames.resyncs
+
+    @property
+    def discarded(self) -> int:
+        return self._frames.discarded
 
-        result = []
+    @property
+    def invalid_positions(self) -> int:
+        return self._frames.invalid_positions
 
-        if len(buff) == BUFFER_SIZE:
-            for i in range(BUFFER_SIZE // 10):
-                if sample := buff[i * 10:i * 10 + 10]:
-                    header = sample[0]
-                    if header == 0:
-                        if (position := sample[-1]) in {0x01, 0x02, 0x04, 0x08, 0x10}:
-                            index, horizontal, vertical = unpack('>H3s3s', sample[1:-1])
-                            horizontal = unpack('>I', b'\00' + horizontal)[0]
-                            vertical = unpack('>I', b'\00' + vertical)[0]
+    @property
+    def decoded(self) -> int:
+        return self._decoded
 
-                            result.append((index, horizontal, vertical, position))
+    @property
+    def command_errors(self) -> int:
+        return self._command_errors
 
-        return result
+    @property
+    def telemetry(self) -> Telemetry:
+        return self._telemetry
 
-    def marker(self, label: str):
-        self._command(f'O{label}', wait=0)
+    @property
+    def statistics(self) -> LossStatistics:
+        return self._statistics
+
+    @property
+    def clock(self) -> ClockModel:
+        return self._clock
+
+    @property
+    def sink(self) -> callable:
+        return self._sink
+
+    @sink.setter
+    def sink(self, value: callable):
+        self._sink = value
+
+    @property
+    def acquiring(self) -> bool:
+        return self._acquisition is not None and self._acquisition.is_alive()
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    def _on_acquisition_error(self, error: Exception):
+        self._failed = True
+        self._ready = False
+        logger.error(_('Lost the connection with the OpenEOG board on {port}').format(port=self._port))
+
+    def _start_acquisition(self):
+        capacity = self._sampling_rate * RING_BUFFER_SECONDS
+        if self._samples is None or self._samples.capacity != capacity:
+            self._samples = RingBuffer(capacity)
+        else:
+            self._samples.clear()
+
+        if self._poller is not None:
+            self._acquisition = AcquisitionWorker(
+                self._receive_blocking, self._samples, idle_wait=0, on_error=self._on_acquisition_error
+            )
+        else:
+            self._acquisition = AcquisitionWorker(
+                self._receive, self._samples, on_error=self._on_acquisition_error
+            )
+        self._acquisition.start()
+
+    def _stop_acquisition(self):
+        if self._acquisition is not None:
+            self._acquisition.stop()
+            self._acquisition = None
+
+            if overruns := self._samples.overruns:
+                logger.warning(f'{overruns} samples were overwritten before being read')
+
+        if self._statistics.dropped > 0 or self._statistics.out_of_order > 0:
+            logger.warning(f'Test samples: {self._statistics}')
+        else:
+            logger.info(f'Test samples: {self._statistics}')
+
+        if self._clock.updates > 1:
+            logger.info(f'Board clock: {self._clock}')
+
+    def read(self, max_samples: int = 0) -> Samples:
+        # Samples acquired before a stop are still handed out afterwards
+        if self._acquisition is not None or (self._samples is not None and len(self._samples) > 0):
+            samples = self._samples.read(max_samples)
+            samples.board = self._board_id
+            return samples
+        return self._receive(max_samples)
+
+    def _receive(self, max_samples: int = 0) -> Samples:
+        self._read_into_frames()
+        return self._decode(max_samples)
+
+    def _receive_blocking(self) -> Samples:
+        self._wait_into_frames(READ_POLL_TIMEOUT)
+        return self._decode()
+
+    def _decode(self, max_samples: int = 0) -> Samples:
+        received_at = monotonic()
+
+        samples = self._converter(self._frames.read(max_samples))
+        self._decoded += len(samples)
+        samples = self._statistics.number(samples)
+        samples.timestamp = received_at
+        samples.board = self._board_id
+        self._report_loss()
+
+        if len(samples) > 0:
+            self._clock.update(int(samples.counter[-1]), received_at)
+            # Host time of every sample from the board clock, not the time its chunk arrived
+            samples.timestamps = self._clock.to_host(samples.counter)
+            samples.decoded_at = monotonic()
+            if self._sink is not None:
+                self._sink(samples)
+
+        return samples
+
+    def _report_loss(self):
+        dropped = self._statistics.dropped
+        if dropped > self._reported_dropped:
+            now = monotonic()
+            if now - self._loss_reported_at >= LOSS_REPORT_INTERVAL:
+                logger.warning(f'Lost {dropped - self._reported_dropped} samples ({self._statistics})')
+                self._reported_dropped = dropped
+                self._loss_reported_at = now
+
+    def marker(self, label: str) -> float:
+        self._write(f'O{label}')
+        sent_at = monotonic()
+        logger.debug(f'Marker {label} sent at {sent_at:.6f}')
+        return sent_at
 
 
 @atexit.register
@@ -0,0 +1,93 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from os import stat
+from threading import Lock
+from time import monotonic, sleep
+
+from serial import Serial, SerialException
+from serial.tools.list_ports import comports
+from serial.tools.list_ports_common import ListPortInfo
+
+from .commands import COMMAND_POLL_INTERVAL, RESPONSE_TERMINATOR
+
+logger = logging.getLogger('saccrec')
+
+FIRMWARE_REGEX = 'OpenEOG'
+PROBE_TIMEOUT = 0.5
+PROBE_BAUD_RATE = 115200
+
+# A board can be switched on behind a dongle that is already enumerated, so
+# failed probes are only trusted for a few seconds
+NEGATIVE_PROBE_TTL = 5.0
+
+_cache: dict[tuple, tuple[bool, float]] = {}
+_cache_lock = Lock()
+
+
+def _port_key(port: ListPortInfo, baud_rate: int) -> tuple:
+    # The device node is recreated on every hotplug, so its inode tells a
+    # replugged device apart from the one we already probed at the same path
+    try:
+        inode = stat(port.device).st_ino
+    except OSError:
+        inode = None
+    return port.device, port.serial_number, inode, baud_rate
+
+
+def probe_port(device: str, timeout: float = PROBE_TIMEOUT, baud_rate: int = PROBE_BAUD_RATE) -> bool:
+    data = bytearray()
+    try:
+        with Serial(port=device, baudrate=baud_rate, timeout=0) as ser:
+            ser.write(b'v')
+            deadline = monotonic() + timeout
+            while RESPONSE_TERMINATOR not in data:
+                if chunk := ser.read(ser.in_waiting):
+                    data += chunk
+                elif monotonic() >= deadline:
+                    break
+                else:
+                    sleep(COMMAND_POLL_INTERVAL)
+    except (OSError, SerialException) as error:
+        logger.debug(f'Probing {device} failed: {error}')
+        return False
+
+    return re.search(FIRMWARE_REGEX, data.decode('utf-8', errors='ignore')) is not None
+
+
+def list_openeog_ports(
+    in_use: set[str] = None,
+    timeout: float = PROBE_TIMEOUT,
+    baud_rate: int = PROBE_BAUD_RATE
+) -> list[str]:
+    in_use = in_use or set()
+    keys = {_port_key(port, baud_rate) for port in comports()}
+
+    now = monotonic()
+    with _cache_lock:
+        for key, (found, probed_at) in list(_cache.items()):
+            if key not in keys or (not found and now - probed_at >= NEGATIVE_PROBE_TTL):
+                del _cache[key]
+
+        missing = [key for key in keys if key not in _cache and key[0] not in in_use]
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            found = executor.map(lambda key: probe_port(key[0], timeout, baud_rate), missing)
+            probed_at = monotonic()
+            results = {key: (result, probed_at) for key, result in zip(missing, found)}
+
+        with _cache_lock:
+            _cache.update(results)
+
+    with _cache_lock:
+        return sorted(
+            key[0]
+            for key in keys
+            if key[0] in in_use or _cache.get(key, (False, None))[0]
+        )
+
+
+def invalidate_ports_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,400 @@
+import argparse
+import os
+import select
+import tty
+from math import floor
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+from numpy import arange, clip, float64, int64, ndarray, ones, uint8, zeros
+from numpy.random import default_rng
+
+from .commands import RESPONSE_TERMINATOR
+from .decoding import FRAME_DTYPE
+
+SIMULATOR_VERSION = '1.0'
+SAMPLING_RATES = (250, 500, 1000, 2000, 4000, 8000, 16000)
+
+STREAM_INTERVAL = 0.001
+UV_PER_COUNT = 4.5 / 24 / (2 ** 23 - 1) * 1e6
+UV_PER_DEGREE = 20.0
+BASELINE_UV = 500.0
+
+_MARKERS = {
+    'l': 0x01,
+    'r': 0x02,
+    't': 0x04,
+    'b': 0x08,
+    'c': 0x10,
+}
+
+
+class _Eye:
+
+    def __init__(self, rng, angle: float):
+        self._rng = rng
+        self._half_angle = angle / 2.0
+
+        self.horizontal = 0.0
+        self.vertical = 0.0
+        self._saccade = None
+
+    def _target(self, position: int) -> tuple[float, float]:
+        return {
+            0x01: (-self._half_angle, 0.0),
+            0x02: (self._half_angle, 0.0),
+            0x04: (0.0, self._half_angle),
+            0x08: (0.0, -self._half_angle),
+        }.get(position, (0.0, 0.0))
+
+    def look_at(self, position: int, sample: int, sampling_rate: int):
+        target_h, target_v = self._target(position)
+        amplitude = max(abs(target_h - self.horizontal), abs(target_v - self.vertical))
+        latency = self._rng.uniform(0.15, 0.25)
+        duration = (2.2 * amplitude + 21.0) / 1000.0
+
+        self._saccade = (
+            sample + floor(latency * sampling_rate),
+            max(floor(duration * sampling_rate), 1),
+            (self.horizontal, self.vertical),
+            (target_h, target_v),
+        )
+
+    def trajectory(self, first: int, count: int) -> tuple:
+        horizontal = ones(count, dtype=float64) * self.horizontal
+        vertical = ones(count, dtype=float64) * self.vertical
+
+        if self._saccade is not None:
+            onset, duration, (from_h, from_v), (to_h, to_v) = self._saccade
+            progress = clip((arange(first, first + count) - onset) / duration, 0.0, 1.0)
+            progress = progress * progress * (3.0 - 2.0 * progress)
+
+            horizontal = from_h + (to_h - from_h) * progress
+            vertical = from_v + (to_v - from_v) * progress
+
+            if first + count >= onset + duration:
+                self._saccade = None
+
+        self.horizontal = float(horizontal[-1])
+        self.vertical = float(vertical[-1])
+
+        return horizontal, vertical
+
+
+def _to_counts(microvolts: ndarray) -> ndarray:
+    counts = (microvolts / UV_PER_COUNT).astype(int64)
+    return clip(counts, -(1 << 23), (1 << 23) - 1) & 0xFFFFFF
+
+
+def _put_24bits(frames: ndarray, field: str, counts: ndarray):
+    frames[field][:, 0] = counts >> 16
+    frames[field][:, 1] = (counts >> 8) & 0xFF
+    frames[field][:, 2] = counts & 0xFF
+
+
+class BoardSimulator:
+
+    def __init__(
+        self,
+        sampling_rate: int = 1000,
+        noise: float = 5.0,
+        drop_rate: float = 0.0,
+        corruption_rate: float = 0.0,
+        angle: float = 30.0,
+        fixation: float = 0.0,
+        seed: int = None
+    ):
+        self._sampling_rate = sampling_rate
+        self._noise = noise
+        self._drop_rate = drop_rate
+        self._corruption_rate = corruption_rate
+        self._fixation = fixation
+
+        self._rng = default_rng(seed)
+        self._eye = _Eye(self._rng, angle)
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._port = os.ttyname(self._slave)
+
+        self._lock = Lock()
+        self._write_lock = Lock()
+        self._stop_event = Event()
+        self._streaming = Event()
+        self._threads = []
+
+        self._position = _MARKERS['c']
+        self._sample = 0
+        self._stream_started_at = 0.0
+        self._sd_files = 0
+
+        self._sent = 0
+        self._dropped = 0
+        self._corrupted = 0
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    @property
+    def sampling_rate(self) -> int:
+        return self._sampling_rate
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming.is_set()
+
+    @property
+    def sent(self) -> int:
+        return self._sent
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def corrupted(self) -> int:
+        return self._corrupted
+
+    def start(self):
+        self._threads = [
+            Thread(target=self._command_loop, name='OpenEOGSimulatorCommands', daemon=True),
+            Thread(target=self._stream_loop, name='OpenEOGSimulatorStream', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _write(self, data: bytes):
+        view = memoryview(data)
+        while view and not self._stop_event.is_set():
+            view = view[os.write(self._master, view):]
+
+    def _reply(self, message: str, error: bool = False):
+        tag = '[ERR]' if error else '[MSG]'
+        with self._write_lock:
+            self._write(f'{tag} {message}'.encode('ASCII') + RESPONSE_TERMINATOR)
+
+    # ======================================
+    #              Commands
+    # ======================================
+
+    def _command_loop(self):
+        pending = ''
+        while not self._stop_event.is_set():
+            readable = select.select([self._master], [], [], 0.1)[0]
+            if not readable:
+                continue
+
+            try:
+                pending += os.read(self._master, 1024).decode('ASCII', errors='ignore')
+            except OSError:
+                continue
+
+            pending = self._dispatch(pending)
+
+    def _dispatch(self, pending: str) -> str:
+        while pending:
+            cmd = pending[0]
+
+            if cmd == 'x':
+                if (end := pending.find('X')) < 0:
+                    if len(pending) < 9:
+                        return pending
+                    end = 8
+                self._on_channel_settings(pending[:end + 1])
+                pending = pending[end + 1:]
+                continue
+
+            if cmd in 'NO~':
+                size = 3 if cmd == 'N' else 2
+                if len(pending) < size:
+                    return pending
+                if cmd == 'N':
+                    self._reply(f'EOG channels set to {pending[1]} (horizontal) and {pending[2]} (vertical)')
+                elif cmd == '~':
+                    self._on_sampling_rate(pending[1])
+                else:
+                    self._on_marker(pending[1])
+                pending = pending[size:]
+                continue
+
+            pending = pending[1:]
+
+            if cmd == 'v':
+                self._reply(f'OpenEOG Simulator v{SIMULATOR_VERSION}')
+            elif cmd == 'S':
+                self._sd_files += 1
+                self._reply(f'Corresponding SD file {self._sd_files:06X}.EOG')
+            elif cmd == 'j':
+                self._reply('SD file closed')
+            elif cmd == '(':
+                self._start_stream()
+            elif cmd == ')':
+                self._stop_stream()
+
+        return pending
+
+    def _on_channel_settings(self, cmd: str):
+        if len(cmd) < 9 or not cmd.endswith('X'):
+            self._reply('too few chars', error=True)
+        else:
+            self._reply(f'Channel set for {cmd[1]}')
+
+    def _on_sampling_rate(self, code: str):
+        if self.streaming:
+            self._reply('Sample rate can not be changed while streaming', error=True)
+        elif code == '~':
+            self._reply(f'Sample rate is {self._sampling_rate}Hz')
+        elif code.isdigit() and int(code) < len(SAMPLING_RATES):
+            with self._lock:
+                self._sampling_rate = SAMPLING_RATES[-1 - int(code)]
+            self._reply(f'Success: Sample rate is {self._sampling_rate}Hz')
+        else:
+            self._reply('Invalid sample rate', error=True)
+
+    def _on_marker(self, label: str):
+        if (position := _MARKERS.get(label)) is None:
+            return
+
+        with self._lock:
+            if position != self._position:
+                self._position = position
+                self._eye.look_at(position, self._sample, self._sampling_rate)
+
+    def _start_stream(self):
+        with self._lock:
+            self._sample = 0
+            self._stream_started_at = monotonic()
+        self._reply('Stream started')
+        self._streaming.set()
+
+    def _stop_stream(self):
+        with self._write_lock:
+            self._streaming.clear()
+        self._reply('Stream stopped')
+
+    # ======================================
+    #              Streaming
+    # ======================================
+
+    def _stream_loop(self):
+        while not self._stop_event.is_set():
+            if not self._streaming.wait(0.1):
+                continue
+
+            with self._lock:
+                due = floor((monotonic() - self._stream_started_at) * self._sampling_rate)
+                count = due - self._sample
+                if count > 0:
+                    data = self._generate(count)
+
+            if count > 0:
+                with self._write_lock:
+                    if self._streaming.is_set():
+                        self._write(data)
+            sleep(STREAM_INTERVAL)
+
+    def _autonomous_marker(self, first: int, count: int):
+        if self._fixation <= 0:
+            return
+
+        samples = floor(self._fixation * self._sampling_rate)
+        if first // samples != (first + count) // samples:
+            position = _MARKERS['l'] if ((first + count) // samples) % 2 else _MARKERS['r']
+            self._position = position
+            self._eye.look_at(position, first + count, self._sampling_rate)
+
+    def _generate(self, count: int) -> bytes:
+        first = self._sample
+        self._sample += count
+        self._autonomous_marker(first, count)
+
+        horizontal, vertical = self._eye.trajectory(first, count)
+        horizontal = BASELINE_UV + horizontal * UV_PER_DEGREE + self._rng.normal(0.0, self._noise, count)
+        vertical = BASELINE_UV + vertical * UV_PER_DEGREE + self._rng.normal(0.0, self._noise, count)
+
+        frames = zeros(count, dtype=FRAME_DTYPE)
+        frames['index'] = arange(first, first + count) & 0xFFFF
+        _put_24bits(frames, 'horizontal', _to_counts(horizontal))
+        _put_24bits(frames, 'vertical', _to_counts(vertical))
+        frames['position'] = self._position
+
+        if self._drop_rate > 0:
+            kept = self._rng.random(count) >= self._drop_rate
+            self._dropped += count - int(kept.sum())
+            frames = frames[kept]
+
+        data = frames.view(uint8)
+        if self._corruption_rate > 0 and len(frames):
+            corrupted = (self._rng.random(len(frames)) < self._corruption_rate).nonzero()[0]
+            offsets = corrupted * FRAME_DTYPE.itemsize + self._rng.integers(0, FRAME_DTYPE.itemsize, len(corrupted))
+            data[offsets] = self._rng.integers(0, 256, len(corrupted))
+            self._corrupted += len(corrupted)
+
+        self._sent += len(frames)
+        return data.tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Virtual OpenEOG board on a pseudo-terminal')
+    parser.add_argument('--rate', type=int, default=1000, choices=SAMPLING_RATES, help='sampling rate in Hz')
+    parser.add_argument('--noise', type=float, default=5.0, help='noise standard deviation in uV')
+    parser.add_argument('--drop', type=float, default=0.0, help='probability of dropping a frame')
+    parser.add_argument('--corrupt', type=float, default=0.0, help='probability of corrupting a frame byte')
+    parser.add_argument('--angle', type=float, default=30.0, help='saccade amplitude in degrees')
+    parser.add_argument('--fixation', type=float, default=0.0, help='alternate targets every N seconds without markers')
+    parser.add_argument('--link', type=str, default=None, help='symlink pointing to the simulated port')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = BoardSimulator(
+        sampling_rate=args.rate,
+        noise=args.noise,
+        drop_rate=args.drop,
+        corruption_rate=args.corrupt,
+        angle=args.angle,
+        fixation=args.fixation,
+        seed=args.seed
+    )
+
+    port = simulator.port
+    if args.link is not None:
+        if os.path.lexists(args.link):
+            os.remove(args.link)
+        os.symlink(port, args.link)
+        port = args.link
+
+    print(f'Simulating OpenEOG board at {port} ({args.rate} Hz), press Ctrl+C to quit')
+
+    simulator.start()
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        if args.link is not None and os.path.islink(args.link):
+            os.remove(args.link)
+
+    print(f'{simulator.sent} frames sent, {simulator.dropped} dropped, {simulator.corrupted} corrupted')
+
+
+if __name__ == '__main__':
+    main()
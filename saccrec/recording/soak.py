@@ -0,0 +1,117 @@
+import argparse
+import logging
+import os
+import sys
+from tempfile import mkstemp
+from time import monotonic, sleep
+
+from .journal import JournalWriter
+from .openeog import CytonBoard, minimum_baud_rate
+from .simulator import SAMPLING_RATES, BoardSimulator
+
+SOAK_SECONDS = 30.0
+SOAK_READ_INTERVAL = 1.0 / 60.0
+SOAK_MARKER_INTERVAL = 1.0
+
+
+def soak(
+    sampling_rate: int,
+    seconds: float,
+    read_interval: float = SOAK_READ_INTERVAL,
+    seed: int = 0
+) -> dict:
+    fd, journal_path = mkstemp(suffix='.dat', prefix='soak')
+    os.close(fd)
+
+    with BoardSimulator(sampling_rate=1000, seed=seed) as simulator:
+        board = CytonBoard(
+            port=simulator.port,
+            sampling_rate=sampling_rate,
+            baud_rate=minimum_baud_rate(sampling_rate)
+        )
+        journal = JournalWriter(journal_path)
+        board.sink = journal.write
+
+        received = 0
+        markers = 0
+        try:
+            board.start()
+            started_at = marked_at = monotonic()
+            while (now := monotonic()) - started_at < seconds:
+                if now - marked_at >= SOAK_MARKER_INTERVAL:
+                    board.marker('lr'[markers % 2])
+                    markers += 1
+                    marked_at = now
+                received += len(board.read())
+                sleep(read_interval)
+            board.stop()
+            received += len(board.read())
+            overruns = board.overruns
+        finally:
+            board.sink = None
+            journal.close()
+            board.close()
+
+        result = {
+            'ready': board.ready,
+            'configured': simulator.sampling_rate,
+            'sent': simulator.sent,
+            'received': received,
+            'journaled': journal.written,
+            'dropped': board.statistics.dropped,
+            'out_of_order': board.statistics.out_of_order,
+            'overruns': overruns,
+            'resyncs': board.resyncs,
+            'rate': received / seconds,
+        }
+
+    os.remove(journal_path)
+    return result
+
+
+def _passed(sampling_rate: int, result: dict) -> bool:
+    return (
+        result['ready'] and
+        result['configured'] == sampling_rate and
+        result['received'] > 0 and
+        result['journaled'] == result['received'] and
+        result['dropped'] == 0 and
+        result['out_of_order'] == 0 and
+        result['overruns'] == 0 and
+        result['resyncs'] == 0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Stream from a simulated OpenEOG board at each sampling rate and check for loss'
+    )
+    parser.add_argument('--seconds', type=float, default=SOAK_SECONDS, help='streaming time per rate')
+    parser.add_argument('--rates', type=int, nargs='+', default=SAMPLING_RATES, choices=SAMPLING_RATES)
+    parser.add_argument('--interval', type=float, default=SOAK_READ_INTERVAL, help='seconds between reads')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger('saccrec').setLevel(logging.ERROR)
+
+    print(
+        f'{"rate":>6} {"baud":>8} {"sent":>9} {"received":>9} {"journaled":>9} '
+        f'{"dropped":>7} {"overruns":>8} {"resyncs":>7} {"smp/s":>9}  result'
+    )
+
+    failed = False
+    for rate in args.rates:
+        result = soak(rate, args.seconds, args.interval, args.seed)
+        passed = _passed(rate, result)
+        failed |= not passed
+        print(
+            f'{rate:>6} {minimum_baud_rate(rate):>8} {result["sent"]:>9} {result["received"]:>9} '
+            f'{result["journaled"]:>9} {result["dropped"]:>7} {result["overruns"]:>8} '
+            f'{result["resyncs"]:>7} {result["rate"]:>9.1f}  {"ok" if passed else "FAILED"}'
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
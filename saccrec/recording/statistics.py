@@ -0,0 +1,202 @@
+from threading import Lock
+
+from numpy import arange, array, diff, int64, ndarray, zeros
+
+from .decoding import Samples
+
+INDEX_MODULO = 1 << 16
+_HALF_MODULO = INDEX_MODULO // 2
+_MAX_TRACKED_GAP = 1024
+
+
+class LossStatistics:
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._last_index = None
+            self._last_counter = -1
+            self._suspect = None
+            self._held = Samples.empty()
+            self._missing = set()
+
+            self._received = 0
+            self._dropped = 0
+            self._duplicated = 0
+            self._out_of_order = 0
+            self._corrupted = 0
+
+    def __str__(self):
+        return (
+            f'{self.received} received, {self.dropped} dropped ({self.loss_ratio:.2%}), '
+            f'{self.duplicated} duplicated, {self.out_of_order} out of order, '
+            f'{self.corrupted} corrupted'
+        )
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def duplicated(self) -> int:
+        return self._duplicated
+
+    @property
+    def out_of_order(self) -> int:
+        return self._out_of_order
+
+    @property
+    def corrupted(self) -> int:
+        return self._corrupted
+
+    @property
+    def expected(self) -> int:
+        return self._last_counter + 1
+
+    @property
+    def loss_ratio(self) -> float:
+        if (expected := self.expected) > 0:
+            return self._dropped / expected
+        return 0.0
+
+    @property
+    def last_counter(self) -> int:
+        return self._last_counter
+
+    def update(self, index: ndarray) -> ndarray:
+        # Counters come back for every frame except an ambiguous last one,
+        # which is held and returned first once the next call resolves it
+        if len(index) == 0:
+            return zeros(0, dtype=int64)
+
+        with self._lock:
+            self._received += len(index)
+
+            if self._last_index is not None and self._suspect is None:
+                steps = diff(index.astype(int64), prepend=self._last_index) % INDEX_MODULO
+                if (steps == 1).all():
+                    first = self._last_counter + 1
+                    self._last_index = int(index[-1])
+                    self._last_counter += len(index)
+                    return arange(first, first + len(index), dtype=int64)
+
+            counters = self._track(index)
+
+            if len(self._missing) > _MAX_TRACKED_GAP:
+                self._missing = {
+                    counter
+                    for counter in self._missing
+                    if counter > self._last_counter - _HALF_MODULO
+                }
+
+            return counters
+
+    def number(self, samples: Samples) -> Samples:
+        held = self._held
+        counters = self.update(samples.index)
+
+        if len(held) > 0:
+            samples = Samples.concatenate([held, samples])
+        self._held = samples[len(counters):]
+
+        samples = samples[:len(counters)]
+        samples.counter = counters
+        return samples
+
+    def _step(self, index: int) -> int:
+        return (index - self._last_index + _HALF_MODULO) % INDEX_MODULO - _HALF_MODULO
+
+    def _advance(self, index: int, step: int) -> int:
+        if step > 1:
+            self._dropped += step - 1
+            if step <= _MAX_TRACKED_GAP:
+                self._missing.update(range(self._last_counter + 1, self._last_counter + step))
+
+        self._last_index = index
+        self._last_counter += step
+        return self._last_counter
+
+    def _is_late(self, index: int) -> bool:
+        step = self._step(index)
+        return step < 0 and self._last_counter + step in self._missing
+
+    def _classify(self, index: int) -> int:
+        step = self._step(index)
+
+        if step > 0:
+            return self._advance(index, step)
+
+        if step == 0:
+            self._duplicated += 1
+            return self._last_counter
+
+        if step >= -_MAX_TRACKED_GAP:
+            counter = self._last_counter + step
+            if counter in self._missing:
+                self._missing.discard(counter)
+                self._dropped -= 1
+                self._out_of_order += 1
+            else:
+                self._duplicated += 1
+            return counter
+
+        # Far behind and nothing explains it better
+        self._corrupted += 1
+        return self._last_counter
+
+    def _resolve(self, suspect: int, following: int) -> int:
+        if self._is_late(suspect):
+            return self._classify(suspect)
+
+        step = self._step(suspect)
+        after_suspect = (following - suspect + _HALF_MODULO) % INDEX_MODULO - _HALF_MODULO
+        if after_suspect == 1 and step < 0:
+            # Behind the last frame and confirmed by the next: the board restarted its counter
+            return self._advance(suspect, 1)
+
+        if after_suspect == 1 or (step > 0 and 0 < after_suspect <= _MAX_TRACKED_GAP):
+            return self._classify(suspect)
+
+        after_last = self._step(following)
+        if 0 < after_last <= _MAX_TRACKED_GAP:
+            # The frames around it still line up, only its index got corrupted
+            self._corrupted += 1
+            if after_last > 1:
+                return self._advance((self._last_index + 1) % INDEX_MODULO, 1)
+            return self._last_counter
+
+        if -_MAX_TRACKED_GAP <= step <= _MAX_TRACKED_GAP:
+            return self._classify(suspect)
+
+        # A lone outlier never moves the baseline
+        self._corrupted += 1
+        return self._last_counter
+
+    def _track(self, index: ndarray) -> ndarray:
+        counters = []
+
+        for value in index.tolist():
+            if self._last_index is None:
+                self._last_index = value
+                self._last_counter = 0
+                counters.append(0)
+                continue
+
+            if self._suspect is not None:
+                counters.append(self._resolve(self._suspect, value))
+                self._suspect = None
+
+            if self._step(value) == 1:
+                counters.append(self._advance(value, 1))
+            else:
+                # Any irregular step is confirmed or explained by the next frame
+                self._suspect = value
+
+        return array(counters, dtype=int64)
@@ -0,0 +1,94 @@
+import logging
+from collections import deque
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from numpy import array, dtype, ndarray
+
+logger = logging.getLogger('saccrec')
+
+TELEMETRY_INTERVAL = 1.0
+TELEMETRY_HISTORY = 3600
+
+TELEMETRY_DTYPE = dtype([
+    ('timestamp', 'f8'),
+    ('backlog', 'i8'),
+    ('decode_rate', 'f8'),
+    ('resyncs', 'i8'),
+    ('invalid_positions', 'i8'),
+    ('command_errors', 'i8'),
+])
+
+
+class Telemetry(Thread):
+
+    def __init__(
+        self,
+        board,
+        interval: float = TELEMETRY_INTERVAL,
+        history: int = TELEMETRY_HISTORY,
+        path: str = None
+    ):
+        super(Telemetry, self).__init__(name='OpenEOGTelemetry', daemon=True)
+
+        self._board = board
+        self._interval = interval
+        self._records = deque(maxlen=history)
+        self._lock = Lock()
+        self._stop_event = Event()
+
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'at')
+            # Appending to an earlier session's log keeps its header
+            if self._file.tell() == 0:
+                self._file.write(','.join(TELEMETRY_DTYPE.names) + '\n')
+
+        self.start()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def latest(self) -> tuple:
+        with self._lock:
+            return self._records[-1] if self._records else None
+
+    def series(self) -> ndarray:
+        with self._lock:
+            return array(list(self._records), dtype=TELEMETRY_DTYPE)
+
+    def run(self):
+        sampled_at = monotonic()
+        decoded = self._board.decoded
+
+        while not self._stop_event.wait(self._interval):
+            now = monotonic()
+            current = self._board.decoded
+
+            record = (
+                now,
+                self._board.pending,
+                (current - decoded) / (now - sampled_at),
+                self._board.resyncs,
+                self._board.invalid_positions,
+                self._board.command_errors,
+            )
+            sampled_at, decoded = now, current
+
+            with self._lock:
+                self._records.append(record)
+
+            if self._file is not None:
+                self._file.write(f'{now:.3f},{record[1]},{record[2]:.1f},{record[3]},{record[4]},{record[5]}\n')
+                self._file.flush()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(self._interval)
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
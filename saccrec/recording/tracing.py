@@ -0,0 +1,76 @@
+import logging
+
+from numpy import logspace, searchsorted, zeros
+
+logger = logging.getLogger('saccrec')
+
+TRACE_STAGES = ('decode', 'handoff', 'plot', 'total')
+
+# 1 us to 10 s in 10 bins per decade
+TRACE_EDGES = logspace(-6, 1, 71)
+
+
+class LatencyTracer:
+
+    def __init__(self, edges=TRACE_EDGES):
+        self._edges = edges
+        self._histograms = zeros((len(TRACE_STAGES), len(edges) + 1), dtype='i8')
+        self._maximum = zeros(len(TRACE_STAGES))
+
+    @property
+    def count(self) -> int:
+        return int(self._histograms[0].sum())
+
+    def record(self, received_at: float, decoded_at: float, handoff_at: float, plotted_at: float):
+        if received_at is None or decoded_at is None:
+            return
+
+        latencies = (
+            decoded_at - received_at,
+            handoff_at - decoded_at,
+            plotted_at - handoff_at,
+            plotted_at - received_at,
+        )
+        for stage, latency in enumerate(latencies):
+            self._histograms[stage, searchsorted(self._edges, latency)] += 1
+            self._maximum[stage] = max(self._maximum[stage], latency)
+
+    def reset(self):
+        self._histograms[:] = 0
+        self._maximum[:] = 0
+
+    def histogram(self, stage: str) -> tuple:
+        return self._histograms[TRACE_STAGES.index(stage)].copy(), self._edges
+
+    def percentile(self, stage: str, q: float) -> float:
+        counts = self._histograms[TRACE_STAGES.index(stage)]
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+
+        # Upper edge of the bin holding the q-th sample, so never optimistic
+        maximum = float(self._maximum[TRACE_STAGES.index(stage)])
+        bucket = int(searchsorted(counts.cumsum(), total * q / 100.0))
+        if bucket >= len(self._edges):
+            return maximum
+        return min(float(self._edges[bucket]), maximum)
+
+    def summary(self) -> dict:
+        return {
+            stage: {
+                'p50': self.percentile(stage, 50),
+                'p99': self.percentile(stage, 99),
+                'max': float(self._maximum[index]),
+            }
+            for index, stage in enumerate(TRACE_STAGES)
+        }
+
+    def report(self):
+        if self.count == 0:
+            return
+
+        stages = ', '.join(
+            f'{stage} p50={values["p50"] * 1e3:.2f} p99={values["p99"] * 1e3:.2f} max={values["max"] * 1e3:.2f} ms'
+            for stage, values in self.summary().items()
+        )
+        logger.info(f'Latency over {self.count} reads: {stages}')
@@ -4,7 +4,7 @@ from typing import Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from saccrec.core.enums import Gain
+from saccrec.core.enums import Gain, SamplingRate
 from saccrec.core.screen import Screen
 
 _settings = QtCore.QSettings()
@@ -65,6 +65,14 @@ class _GUISettings:
     def sd_path(self, value: str):
         _settings.setValue("GUI/SDPath", value)
 
+    @property
+    def trace_latency(self) -> bool:
+        return _settings.value("GUI/TraceLatency", "0") == "1"
+
+    @trace_latency.setter
+    def trace_latency(self, value: bool):
+        _settings.setValue("GUI/TraceLatency", "1" if value else "0")
+
 
 gui = _GUISettings()
 
@@ -169,6 +177,10 @@ class _HardwareSettings:
 
         from saccrec.recording import CytonBoard
 
+        # The stored board went away, so earlier probe results can't be trusted
+        if port:
+            CytonBoard.invalidate_ports()
+
         ports = CytonBoard.list_ports()
         if ports and exists(ports[0]):
             _settings.setValue("Hardware/Port", ports[0])
@@ -191,6 +203,50 @@ class _HardwareSettings:
     def sampling_rate(self, value: int):
         _settings.setValue("Hardware/SamplingRate", value)
 
+    @property
+    def sampling_rate_command(self) -> str:
+        return SamplingRate.from_value(self.sampling_rate).command
+
+    @property
+    def baud_rate(self) -> int:
+        return int(_settings.value("Hardware/BaudRate", 115200))
+
+    @baud_rate.setter
+    def baud_rate(self, value: int):
+        _settings.setValue("Hardware/BaudRate", value)
+
+    @property
+    def latency_timer(self) -> int:
+        return int(_settings.value("Hardware/LatencyTimer", 1))
+
+    @latency_timer.setter
+    def latency_timer(self, value: int):
+        _settings.setValue("Hardware/LatencyTimer", value)
+
+    @property
+    def blocking_reads(self) -> bool:
+        return _settings.value("Hardware/BlockingReads", "1") == "1"
+
+    @blocking_reads.setter
+    def blocking_reads(self, value: bool):
+        _settings.setValue("Hardware/BlockingReads", "1" if value else "0")
+
+    @property
+    def start_timeout(self) -> float:
+        return float(_settings.value("Hardware/StartTimeout", 2.0))
+
+    @start_timeout.setter
+    def start_timeout(self, value: float):
+        _settings.setValue("Hardware/StartTimeout", value)
+
+    @property
+    def stop_timeout(self) -> float:
+        return float(_settings.value("Hardware/StopTimeout", 2.0))
+
+    @stop_timeout.setter
+    def stop_timeout(self, value: float):
+        _settings.setValue("Hardware/StopTimeout", value)
+
     @property
     def horizontal_channel(self) -> int:
         return int(_settings.value("Hardware/HorizontalChannel", 1))
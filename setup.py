@@ -35,7 +35,11 @@ setup(
     entry_points={
         "gui_scripts": ["SaccRec = saccrec:main"],
         "console_scripts": [
-            "TestOpenEOGRecordings = saccrec.recording.test_recording:main"
+            "TestOpenEOGRecordings = saccrec.recording.test_recording:main",
+            "OpenEOGSimulator = saccrec.recording.simulator:main",
+            "OpenEOGBenchmark = saccrec.recording.benchmark:main",
+            "OpenEOGSoak = saccrec.recording.soak:main",
+            "saccrec-recover = saccrec.core.recovery:main",
         ],
     },
     data_files=[
@@ -0,0 +1,6 @@
+import builtins
+import os
+
+# The package installs gettext's _ at startup, tests run without it
+builtins.__dict__.setdefault('_', lambda message: message)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
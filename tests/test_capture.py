@@ -0,0 +1,80 @@
+import os
+from threading import Thread
+from time import monotonic, sleep
+
+from saccrec.recording import CytonBoard
+from saccrec.recording.capture import (CAPTURE_MAGIC, CAPTURE_RECEIVED, CAPTURE_SENT, CaptureWriter, _RECORD,
+                                       capture_sampling_rate, read_capture)
+from saccrec.recording.simulator import BoardSimulator
+
+
+def test_concurrent_writes_keep_records_whole(tmp_path):
+    path = str(tmp_path / 'threads.cap')
+    writer = CaptureWriter(path)
+
+    def write(direction: int, payload: bytes):
+        for _ in range(20000):
+            writer.write(payload, monotonic(), direction)
+
+    threads = [
+        Thread(target=write, args=(CAPTURE_RECEIVED, bytes(range(10)) * 3)),
+        Thread(target=write, args=(CAPTURE_SENT, b'Ol')),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    records = list(read_capture(path))
+    assert len(records) == 40000
+    assert all(
+        data == (bytes(range(10)) * 3 if direction == CAPTURE_RECEIVED else b'Ol')
+        for _timestamp, direction, data in records
+    )
+
+
+def test_capture_while_sending_markers(tmp_path):
+    path = str(tmp_path / 'board.cap')
+
+    with BoardSimulator(sampling_rate=4000, seed=2) as simulator:
+        board = CytonBoard(port=simulator.port, capture=path, sampling_rate=4000)
+        board.start()
+        for index in range(200):
+            board.marker('lr'[index % 2])
+            sleep(0.002)
+        board.stop()
+        board.close()
+
+    records = list(read_capture(path))
+    markers = [data for _timestamp, direction, data in records if direction == CAPTURE_SENT and data[:1] == b'O']
+    assert len(markers) == 200
+
+    # Every byte of the file belongs to a whole record
+    size = len(CAPTURE_MAGIC) + sum(_RECORD.size + len(data) for _timestamp, _direction, data in records)
+    assert size == os.path.getsize(path)
+
+
+def test_replay_uses_the_captured_sampling_rate(tmp_path):
+    path = str(tmp_path / 'fast.cap')
+
+    with BoardSimulator(sampling_rate=1000, seed=4) as simulator:
+        board = CytonBoard(port=simulator.port, capture=path, sampling_rate=4000, baud_rate=460800)
+        board.start()
+        sleep(0.5)
+        board.stop()
+        received = board.statistics.received
+        board.close()
+
+    assert capture_sampling_rate(path) == 4000
+
+    replay = CytonBoard.replay(path, realtime=False)
+    assert replay.ready
+    assert replay.sampling_rate == 4000
+    replay.start()
+    sleep(0.5)
+    replay.stop()
+    replayed = replay.statistics.received
+    replay.close()
+
+    assert replayed == received
@@ -0,0 +1,24 @@
+from saccrec.recording.commands import Response, channel_confirmed, command_succeeded, sampling_rate_confirmed
+
+
+def _response(command: str, message: bytes) -> Response:
+    return Response(command, message, 0.0)
+
+
+def test_sampling_rate_must_match():
+    assert sampling_rate_confirmed(_response('~2', b'Success: Sample rate is 4000Hz$$$'), 4000)
+    assert not sampling_rate_confirmed(_response('~2', b'Success: Sample rate is 1000Hz$$$'), 4000)
+    assert not sampling_rate_confirmed(_response('~2', b'Success: Sample rate is 4000'), 4000)
+
+
+def test_errors_and_timeouts_fail():
+    assert command_succeeded(_response('N12', b'EOG channels set$$$'))
+    assert not command_succeeded(_response('N12', b'[ERR]Invalid channels$$$'))
+    assert not command_succeeded(_response('N12', b'EOG chan'))
+
+
+def test_channel_replies_must_line_up():
+    assert channel_confirmed(_response('x1060110X', b'Success: Channel set for 1$$$'), 'x1060110X')
+    assert not channel_confirmed(_response('x2060110X', b'Success: Channel set for 1$$$'), 'x2060110X')
+    assert not channel_confirmed(_response('x1060110X', b'Failure: too few chars$$$'), 'x1060110X')
+    assert not channel_confirmed(_response('x1060110X', b'[ERR]too few chars$$$'), 'x1060110X')
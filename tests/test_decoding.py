@@ -0,0 +1,164 @@
+import random
+
+from numpy import array, uint8
+
+from saccrec.recording.decoding import FRAME_POSITIONS, FRAME_SIZE, FrameReader, _join_24bits, decode_frames
+
+
+def _frame(index: int, horizontal: int, vertical: int, position: int) -> bytes:
+    return (
+        b'\x00' +
+        (index & 0xFFFF).to_bytes(2, 'big') +
+        (horizontal & 0xFFFFFF).to_bytes(3, 'big') +
+        (vertical & 0xFFFFFF).to_bytes(3, 'big') +
+        bytes([position])
+    )
+
+
+def _frames(count: int, rng: random.Random) -> list[tuple]:
+    return [
+        (
+            index & 0xFFFF,
+            rng.randint(-(1 << 23), (1 << 23) - 1),
+            rng.randint(-(1 << 23), (1 << 23) - 1),
+            rng.choice(FRAME_POSITIONS)
+        )
+        for index in range(count)
+    ]
+
+
+def _decoded(reader: FrameReader, max_frames: int = 0) -> list[tuple]:
+    samples = reader.read(max_frames)
+    return list(zip(
+        samples.index.tolist(),
+        samples.horizontal.tolist(),
+        samples.vertical.tolist(),
+        samples.position.tolist()
+    ))
+
+
+def _feed_in_chunks(reader: FrameReader, data: bytes, rng: random.Random) -> list[tuple]:
+    decoded = []
+    position = 0
+    while position < len(data):
+        size = rng.randint(1, 3 * FRAME_SIZE)
+        reader.feed(data[position:position + size])
+        position += size
+        decoded += _decoded(reader)
+    return decoded
+
+
+def test_join_24bits_sign_extension():
+    words = array([
+        [0x00, 0x00, 0x00],
+        [0x00, 0x00, 0x01],
+        [0x7F, 0xFF, 0xFF],
+        [0x80, 0x00, 0x00],
+        [0x80, 0x00, 0x01],
+        [0xFF, 0xFF, 0xFF],
+    ], dtype=uint8)
+
+    assert _join_24bits(words).tolist() == [0, 1, (1 << 23) - 1, -(1 << 23), -(1 << 23) + 1, -1]
+
+
+def test_decode_frames_round_trip():
+    frames = _frames(500, random.Random(1))
+    data = b''.join(_frame(*frame) for frame in frames)
+
+    samples = decode_frames(data)
+    assert list(zip(
+        samples.index.tolist(), samples.horizontal.tolist(), samples.vertical.tolist(), samples.position.tolist()
+    )) == frames
+
+
+def test_random_chunk_splits():
+    rng = random.Random(2)
+    frames = _frames(5000, rng)
+    reader = FrameReader(capacity=64)
+
+    assert _feed_in_chunks(reader, b''.join(_frame(*frame) for frame in frames), rng) == frames
+    assert reader.resyncs == 0
+    assert len(reader) == 0
+
+
+def test_garbage_between_frames_is_skipped():
+    rng = random.Random(3)
+    frames = _frames(2000, rng)
+
+    # Without zeros the garbage can't hold a header, so every frame must survive as
+    # long as the frame after the garbage is confirmed by the one following it
+    data = bytearray()
+    garbage = 0
+    clean = True
+    for frame in frames:
+        clean = not clean or rng.random() >= 0.05
+        if not clean:
+            size = rng.randint(1, 2 * FRAME_SIZE)
+            data += bytes(rng.randint(1, 255) for _ in range(size))
+            garbage += size
+        data += _frame(*frame)
+
+    reader = FrameReader()
+    assert _feed_in_chunks(reader, bytes(data), rng) == frames
+    assert reader.discarded == garbage
+
+
+def test_corrupted_bytes_only_cost_nearby_frames():
+    rng = random.Random(4)
+    frames = _frames(5000, rng)
+    data = bytearray(b''.join(_frame(*frame) for frame in frames))
+
+    corrupted = 50
+    for offset in rng.sample(range(len(data)), corrupted):
+        data[offset] ^= rng.randint(1, 255)
+
+    decoded = _feed_in_chunks(FrameReader(), bytes(data), rng)
+
+    # Payload damage passes through, but frames are never invented or shifted
+    assert len(decoded) <= len(frames)
+    assert all(frame[3] in FRAME_POSITIONS for frame in decoded)
+    assert len(set(decoded) & set(frames)) >= len(frames) - 3 * corrupted
+
+
+def test_resync_skips_leading_bytes():
+    frames = _frames(3, random.Random(5))
+    reader = FrameReader()
+    reader.feed(b'\x07\x09\x0b' + b''.join(_frame(*frame) for frame in frames))
+
+    assert _decoded(reader) == frames
+    assert reader.resyncs == 1
+    assert reader.discarded == 3
+
+
+def test_resync_waits_for_a_confirming_frame():
+    # A zero followed nine bytes later by a valid position, but misaligned by the payload
+    fake = b'\x00\x00\x01\x00\x00\x00\x00\x00\x00\x01'
+    frames = _frames(2, random.Random(6))
+    reader = FrameReader()
+    reader.feed(b'\xff' + fake[:3] + b''.join(_frame(*frame) for frame in frames))
+
+    assert _decoded(reader) == frames
+
+
+def test_valid_run_stops_at_the_first_bad_frame():
+    frames = _frames(4, random.Random(7))
+    data = bytearray(b''.join(_frame(*frame) for frame in frames))
+    data[2 * FRAME_SIZE + FRAME_SIZE - 1] = 0x03
+
+    reader = FrameReader()
+    reader.feed(bytes(data))
+    assert reader._valid_run(0) == 2
+    assert reader._valid_run(1) == 1
+
+    assert _decoded(reader) == frames[:2] + frames[3:]
+    assert reader.invalid_positions == 1
+
+
+def test_max_frames_leaves_the_rest_buffered():
+    frames = _frames(10, random.Random(8))
+    reader = FrameReader()
+    reader.feed(b''.join(_frame(*frame) for frame in frames))
+
+    assert _decoded(reader, 4) == frames[:4]
+    assert len(reader) == 6 * FRAME_SIZE
+    assert _decoded(reader) == frames[4:]
@@ -0,0 +1,77 @@
+import os
+
+from saccrec.recording import ftdi
+
+
+def _fake_tty(root, name: str, driver: str, latency_timer: int = None):
+    device = root / 'devices' / name
+    (device / 'device').mkdir(parents=True)
+    (root / 'class' / 'tty').mkdir(parents=True, exist_ok=True)
+    os.symlink(device, root / 'class' / 'tty' / name)
+
+    (root / 'bus' / driver).mkdir(parents=True, exist_ok=True)
+    os.symlink(root / 'bus' / driver, device / 'device' / 'driver')
+
+    if latency_timer is not None:
+        (device / 'device' / 'latency_timer').write_text(f'{latency_timer}\n')
+
+
+class _Serial:
+
+    def __init__(self, port: str):
+        self.port = port
+        self.low_latency = False
+
+    def set_low_latency_mode(self, value: bool):
+        self.low_latency = value
+
+    def fileno(self) -> int:
+        return -1
+
+
+def test_detects_only_ftdi_devices(tmp_path):
+    _fake_tty(tmp_path, 'ttyUSB0', 'ftdi_sio', 16)
+    _fake_tty(tmp_path, 'ttyUSB1', 'cp210x')
+
+    assert ftdi.ftdi_devices(str(tmp_path)) == ['/dev/ttyUSB0']
+    assert ftdi.is_ftdi('/dev/ttyUSB0', str(tmp_path))
+    assert not ftdi.is_ftdi('/dev/ttyUSB1', str(tmp_path))
+    assert ftdi.ftdi_devices(str(tmp_path / 'missing')) == []
+
+
+def test_sets_and_verifies_latency_timer(tmp_path):
+    _fake_tty(tmp_path, 'ttyUSB0', 'ftdi_sio', 16)
+
+    assert ftdi.read_latency_timer('/dev/ttyUSB0', str(tmp_path)) == 16
+    assert ftdi.set_latency_timer('/dev/ttyUSB0', 1, str(tmp_path)) == 1
+    assert (tmp_path / 'devices' / 'ttyUSB0' / 'device' / 'latency_timer').read_text().strip() == '1'
+
+
+def test_unreadable_latency_timer(tmp_path):
+    _fake_tty(tmp_path, 'ttyUSB0', 'ftdi_sio', 16)
+    timer = tmp_path / 'devices' / 'ttyUSB0' / 'device' / 'latency_timer'
+    timer.unlink()
+    timer.mkdir()
+
+    assert ftdi.set_latency_timer('/dev/ttyUSB0', 1, str(tmp_path)) is None
+
+
+def test_tunes_and_restores_port(tmp_path):
+    _fake_tty(tmp_path, 'ttyUSB0', 'ftdi_sio', 16)
+    serial = _Serial('/dev/ttyUSB0')
+
+    previous = ftdi.tune_serial(serial, 2, str(tmp_path))
+    assert previous == 16
+    assert serial.low_latency
+    assert ftdi.read_latency_timer('/dev/ttyUSB0', str(tmp_path)) == 2
+
+    ftdi.restore_latency_timer('/dev/ttyUSB0', previous, str(tmp_path))
+    assert ftdi.read_latency_timer('/dev/ttyUSB0', str(tmp_path)) == 16
+
+
+def test_leaves_other_ports_alone(tmp_path):
+    _fake_tty(tmp_path, 'ttyACM0', 'cdc_acm')
+    serial = _Serial('/dev/ttyACM0')
+
+    assert ftdi.tune_serial(serial, 1, str(tmp_path)) is None
+    assert not serial.low_latency
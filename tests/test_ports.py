@@ -0,0 +1,53 @@
+from serial.tools.list_ports_common import ListPortInfo
+
+from saccrec.recording import ports
+
+
+def _setup(monkeypatch, tmp_path, answers: dict):
+    device = tmp_path / 'ttyUSB0'
+    device.touch()
+    probes = []
+
+    def probe_port(device, timeout, baud_rate):
+        probes.append(device)
+        return answers['found']
+
+    ports.invalidate_ports_cache()
+    monkeypatch.setattr(ports, 'comports', lambda: [ListPortInfo(str(device))])
+    monkeypatch.setattr(ports, 'probe_port', probe_port)
+    return str(device), probes
+
+
+def test_found_ports_are_cached(monkeypatch, tmp_path):
+    device, probes = _setup(monkeypatch, tmp_path, {'found': True})
+
+    assert ports.list_openeog_ports() == [device]
+    assert ports.list_openeog_ports() == [device]
+    assert probes == [device]
+
+
+def test_failed_probes_expire(monkeypatch, tmp_path):
+    answers = {'found': False}
+    device, probes = _setup(monkeypatch, tmp_path, answers)
+    now = [100.0]
+    monkeypatch.setattr(ports, 'monotonic', lambda: now[0])
+
+    assert ports.list_openeog_ports() == []
+    assert ports.list_openeog_ports() == []
+    assert len(probes) == 1
+
+    # The board is switched on behind the same dongle
+    answers['found'] = True
+    now[0] += ports.NEGATIVE_PROBE_TTL
+    assert ports.list_openeog_ports() == [device]
+    assert len(probes) == 2
+
+
+def test_invalidate_forgets_failed_probes(monkeypatch, tmp_path):
+    answers = {'found': False}
+    device, probes = _setup(monkeypatch, tmp_path, answers)
+
+    assert ports.list_openeog_ports() == []
+    answers['found'] = True
+    ports.invalidate_ports_cache()
+    assert ports.list_openeog_ports() == [device]
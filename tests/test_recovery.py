@@ -0,0 +1,123 @@
+import pytest
+from eoglib.models import Channel, Protocol, SaccadicStimulus, Subject
+from numpy import arange, float32, full, int64, uint8, uint16
+
+from saccrec.core.formats import study_metadata
+from saccrec.core.recovery import recover_study
+from saccrec.recording.decoding import Samples
+from saccrec.recording.journal import JOURNAL_MAGIC, JournalWriter
+
+TEST_SAMPLES = 1000
+
+
+def _samples(start: int, count: int = TEST_SAMPLES) -> Samples:
+    counter = arange(start, start + count, dtype=int64)
+    return Samples(
+        index=(counter & 0xFFFF).astype(uint16),
+        horizontal=counter.astype(float32),
+        vertical=-counter.astype(float32),
+        position=full(count, 1, dtype=uint8),
+        counter=counter,
+        timestamps=100.0 + counter * 1e-3
+    )
+
+
+def _journal(path: str, tests: int) -> JournalWriter:
+    protocol = Protocol(
+        [SaccadicStimulus(angle=30, fixation_duration=3.0, saccades_count=10) for _ in range(tests)],
+        name='Test'
+    )
+    return JournalWriter(
+        path,
+        metadata=study_metadata(
+            subject=Subject(name='Subject'),
+            protocol=protocol,
+            light_intensity=0,
+            output_path='/tmp',
+            source_filename='000001'
+        ),
+        # Every chunk gets its own record, so damage can be placed between them
+        batch_samples=1
+    )
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'study.dat')
+    journal = _journal(path, 3)
+
+    journal.test_started(0, 1.0)
+    journal.write(_samples(0))
+    journal.marker('l', 1.5)
+    journal.test_finished(0, 2.0)
+    journal.marker('r', 2.5)
+    journal.test_started(1, 3.0)
+    journal.write(_samples(TEST_SAMPLES))
+    journal.marker('r', 3.5)
+    journal.close()
+
+    study = recover_study(path)
+    assert len(study) == 3
+
+    first, second, third = study
+    assert first.channels[Channel.Time].tolist() == list(range(TEST_SAMPLES))
+    assert first.channels[Channel.Timestamps][0] == 100.0
+    assert first['complete']
+    # The marker sent between tests belongs to neither
+    assert first['markers'] == [(1.5, 'l')]
+    assert second['markers'] == [(3.5, 'r')]
+
+    # The session ended while the second test was running
+    assert not second['complete']
+    assert second.channels[Channel.Time][0] == TEST_SAMPLES
+    assert third.channels.samples_count == 0
+
+
+def _write_one_test(path: str) -> tuple[bytes, int]:
+    journal = _journal(path, 1)
+    journal.test_started(0, 1.0)
+    journal.write(_samples(0))
+    journal.write(_samples(TEST_SAMPLES))
+    journal.test_finished(0, 2.0)
+    journal.close()
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Offset of the second samples record's first counter
+    return data, data.rindex(_samples(TEST_SAMPLES).counter[:1].tobytes())
+
+
+def test_truncated_journal_keeps_whole_records(tmp_path):
+    path = str(tmp_path / 'study.dat')
+    data, second = _write_one_test(path)
+
+    # Tear the file in the middle of the second samples record
+    with open(path, 'wb') as f:
+        f.write(data[:second + 100])
+
+    study = recover_study(path)
+    test = study[0]
+    assert test.channels[Channel.Time].tolist() == list(range(TEST_SAMPLES))
+    assert not test['complete']
+
+
+def test_corrupted_record_ends_recovery(tmp_path):
+    path = str(tmp_path / 'study.dat')
+    _data, second = _write_one_test(path)
+
+    with open(path, 'r+b') as f:
+        f.seek(second + 20)
+        f.write(b'\xff')
+
+    study = recover_study(path)
+    test = study[0]
+    assert len(test.channels[Channel.Time]) == TEST_SAMPLES
+    assert not test['complete']
+
+
+def test_journal_without_metadata_is_rejected(tmp_path):
+    path = str(tmp_path / 'empty.dat')
+    with open(path, 'wb') as f:
+        f.write(JOURNAL_MAGIC)
+
+    with pytest.raises(ValueError):
+        recover_study(path)
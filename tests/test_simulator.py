@@ -0,0 +1,74 @@
+from time import sleep
+
+from numpy import diff, median, unique
+
+from saccrec.recording import CytonBoard
+from saccrec.recording.decoding import Samples
+from saccrec.recording.simulator import BoardSimulator
+
+
+def _stream(simulator: BoardSimulator, seconds: float) -> CytonBoard:
+    board = CytonBoard(port=simulator.port, sampling_rate=simulator.sampling_rate)
+    board.start()
+    sleep(seconds)
+    board.read()
+    return board
+
+
+def test_dropped_frames_are_counted():
+    with BoardSimulator(sampling_rate=2000, drop_rate=0.01, seed=3) as simulator:
+        board = _stream(simulator, 1.0)
+        dropped = simulator.dropped
+        counted = board.statistics.dropped
+        board.close()
+
+    # Drops after the last frame read can't be seen yet
+    assert dropped - 3 <= counted <= dropped
+
+
+def test_corruption_does_not_inflate_drops():
+    with BoardSimulator(sampling_rate=4000, corruption_rate=0.01, seed=5) as simulator:
+        board = _stream(simulator, 1.0)
+        received = board.statistics.received
+        dropped = board.statistics.dropped
+        resyncs = board.resyncs
+        board.close()
+
+    assert received > 3000
+    # Every resync can cost the frame it was found in, never more
+    assert dropped <= resyncs + simulator.corrupted
+    assert dropped < received // 100
+
+
+def test_hang_up_marks_the_board_failed():
+    simulator = BoardSimulator(sampling_rate=1000)
+    simulator.start()
+    board = _stream(simulator, 0.2)
+    simulator.stop()
+    sleep(0.2)
+
+    assert board.failed
+    assert not board.ready
+    assert not board.acquiring
+
+    # Neither may touch the dead port
+    board.stop()
+    board.close()
+
+
+def test_samples_are_stamped_from_the_board_clock():
+    chunks = []
+    with BoardSimulator(sampling_rate=1000) as simulator:
+        board = CytonBoard(port=simulator.port, sampling_rate=simulator.sampling_rate)
+        board.sink = chunks.append
+        board.start()
+        sleep(0.5)
+        board.stop()
+        board.close()
+
+    timestamps = Samples.concatenate(chunks).timestamps
+    steps = diff(timestamps)
+
+    # One timestamp per sample, a period apart, not one per chunk
+    assert len(unique(timestamps)) == len(timestamps)
+    assert abs(median(steps) - 1e-3) < 1e-4
@@ -0,0 +1,98 @@
+from numpy import array, float32, uint8, uint16, zeros
+
+from saccrec.recording.decoding import Samples
+from saccrec.recording.statistics import LossStatistics
+
+
+def _update(*chunks: list[int]) -> tuple[list[list[int]], LossStatistics]:
+    statistics = LossStatistics()
+    counters = [statistics.update(array(chunk, dtype=uint16)).tolist() for chunk in chunks]
+    return counters, statistics
+
+
+def _samples(index: list[int]) -> Samples:
+    return Samples(
+        index=array(index, dtype=uint16),
+        horizontal=zeros(len(index), dtype=float32),
+        vertical=zeros(len(index), dtype=float32),
+        position=zeros(len(index), dtype=uint8)
+    )
+
+
+def test_contiguous_chunks():
+    counters, statistics = _update([65534, 65535], [0, 1])
+    assert counters == [[0, 1], [2, 3]]
+    assert statistics.dropped == 0
+
+
+def test_real_gap_is_dropped():
+    counters, statistics = _update([0, 1, 500, 501])
+    assert counters == [[0, 1, 500, 501]]
+    assert statistics.dropped == 498
+
+
+def test_corrupted_index_next_to_discarded_frame():
+    counters, statistics = _update([14332, 14333, 225, 14336, 14337])
+    assert counters == [[0, 1, 2, 4, 5]]
+    assert statistics.dropped == 1
+    assert statistics.corrupted == 1
+
+
+def test_corrupted_index_between_frames():
+    counters, statistics = _update([0, 1, 40000, 3, 4])
+    assert counters == [[0, 1, 2, 3, 4]]
+    assert statistics.dropped == 0
+    assert statistics.corrupted == 1
+
+
+def test_lone_outlier_keeps_baseline():
+    counters, statistics = _update([0, 1, 40000, 2, 3])
+    assert counters[0][-2:] == [2, 3]
+    assert statistics.dropped == 0
+
+
+def test_late_frame_is_out_of_order():
+    counters, statistics = _update([0, 1, 3, 4, 2, 5])
+    assert counters == [[0, 1, 3, 4, 2, 5]]
+    assert statistics.dropped == 0
+    assert statistics.out_of_order == 1
+
+
+def test_confirmed_restart():
+    counters, statistics = _update([100, 101, 102, 7, 8, 9])
+    assert counters == [[0, 1, 2, 3, 4, 5]]
+    assert statistics.dropped == 0
+    assert statistics.duplicated == 0
+
+
+def test_gap_at_chunk_end_is_held():
+    counters, statistics = _update([0, 1, 2], [5], [6])
+    assert counters == [[0, 1, 2], [], [5, 6]]
+    assert statistics.dropped == 2
+
+
+def test_duplicate_at_chunk_end_is_held():
+    counters, statistics = _update([0, 1, 2, 3], [3], [4])
+    assert counters == [[0, 1, 2, 3], [], [3, 4]]
+    assert statistics.duplicated == 1
+
+
+def test_number_holds_ambiguous_tail_sample():
+    statistics = LossStatistics()
+
+    first = statistics.number(_samples([0, 1, 2]))
+    held = statistics.number(_samples([5]))
+    resolved = statistics.number(_samples([6, 7]))
+
+    assert first.counter.tolist() == [0, 1, 2]
+    assert len(held) == 0
+    assert resolved.index.tolist() == [5, 6, 7]
+    assert resolved.counter.tolist() == [5, 6, 7]
+
+
+def test_reset_drops_held_sample():
+    statistics = LossStatistics()
+    statistics.number(_samples([0, 1, 9]))
+    statistics.reset()
+
+    assert statistics.number(_samples([0, 1])).counter.tolist() == [0, 1]